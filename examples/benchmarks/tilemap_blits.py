@@ -0,0 +1,72 @@
+# -----------------------------------------------------------------------------
+# Name:        tilemap_blits.py
+# Purpose:     This will time drawing a full Tilemap one blit at a time, as
+#              the Tilemap used to, against the batched blits it uses now
+#
+# Contributors: James Milam
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Run from this folder. It works without a window:
+#     SDL_VIDEODRIVER=dummy python tilemap_blits.py
+
+import pygame_toolbox.tilegame_tools as pttt
+import pygame
+import timeit
+
+SIZE = (800, 600)
+TILE = (8, 6)
+REPEAT = 20
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(SIZE)
+    columns, rows = SIZE[0] // TILE[0], SIZE[1] // TILE[1]
+    tiles = pttt.Tilelist([[pttt.Tile('../tiletools_example/Forrest.png', TILE)
+                            for j in range(rows)] for i in range(columns)])
+
+    # Shade every other tile so the map holds a mix of images
+    for i in range(columns):
+        for j in range(0, rows, 2):
+            tiles[i][j].toggle_shade('red')
+
+    # Both paths draw the same display format tiles onto a display format
+    # surface, so only the batching is timed. The old path made one blit
+    # call per tile.
+    jobs = [(tiles[i][j].image, (i * TILE[0], j * TILE[1]))
+            for i in range(columns) for j in range(rows)]
+
+    def one_by_one():
+        image = pygame.Surface(SIZE).convert()
+        for job in jobs:
+            image.blit(*job)
+
+    def batched():
+        image = pygame.Surface(SIZE).convert()
+        image.blits(jobs, False)
+
+    def tilemap():
+        pttt.Tilemap(SIZE, tiles, 1)
+
+    count = columns * rows
+    print('%d tiles' % count)
+    results = []
+    for name, func in (('one blit per tile', one_by_one),
+                       ('batched blits', batched),
+                       ('whole Tilemap build', tilemap)):
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        results.append(best)
+        print('%-22s %8.2f ms  %10.0f tiles/s' % (name, best * 1000,
+                                                  count / best))
+    print('blit speed up:         %8.2fx' % (results[0] / results[1]))
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
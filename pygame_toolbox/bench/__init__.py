@@ -0,0 +1,341 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.bench
+# Purpose:     This package times the hot paths of the toolbox without a window
+#              so slowdowns between versions can be caught
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Benchmark
+#   benchmarks
+#   setup_display
+#   run
+#   compare
+#   save_results
+#   load_results
+
+# Run the suite with
+#     python -m pygame_toolbox.bench --output results.json
+# and check for slowdowns with
+#     python -m pygame_toolbox.bench --baseline results.json
+
+from .. import graphics as ptg
+from .. import tilegame_tools as pttt
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import pygame
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SIZE = (800, 600)
+
+
+class Benchmark:
+    def __init__(self, name, setup, params=None):
+        """This class describes one benchmark of the suite.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            name - This is the name the results are saved under.
+
+            setup - This is a function that is called with the display and the
+                params and returns the operation to time. The operation is
+                called with no inputs and returns the number of operations it
+                did, or None for one.
+
+            params - This is a dictionary of the sizes used by the benchmark,
+                saved with the results.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.name = name
+        self.setup = setup
+        self.params = params or {}
+
+    def measure(self, screen, mintime=0.5):
+        """This method returns a dictionary of the operations per second and
+        the peak Python memory of the benchmark.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            screen - This is the pygame display.
+
+            mintime - This is the least number of seconds the operation is
+                repeated for. The default is 0.5.
+
+        The peak memory is measured with tracemalloc over the setup and one
+        operation, separately from the timing so tracing does not slow it
+        down. Surface pixels are allocated by SDL and are not part of it.
+
+        (doc string updated ver 0.2)
+        """
+
+        tracemalloc.start()
+        op = self.setup(screen, self.params)
+        op()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        ops = 0
+        start = time.perf_counter()
+        while True:
+            done = op()
+            ops += 1 if done is None else done
+            elapsed = time.perf_counter() - start
+            if elapsed >= mintime:
+                break
+        return {'ops_per_sec': ops / elapsed, 'peak_bytes': peak,
+                'params': self.params}
+
+
+def setup_display():
+    """Start pygame with the dummy video driver (unless another driver was
+    chosen) and return the display."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+    return pygame.display.set_mode(SIZE)
+
+
+def picture():
+    # A picture file for the picture buttons and tiles to load, made once in
+    # the temporary folder
+    file = os.path.join(tempfile.gettempdir(), 'pygame_toolbox_bench.png')
+    if os.path.exists(file):
+        return file
+    surface = pygame.Surface((64, 64))
+    for i in range(64):
+        pygame.draw.line(surface, (i * 4, 255 - i * 4, 128), (i, 0), (i, 63))
+    pygame.image.save(surface, file)
+    return file
+
+
+def click(screen, button, frames=1):
+    # Make a screen's update loop run for the given number of frames and then
+    # click the button, so update can be timed without a person
+    # Textscreens only has a position once a page is shown, at (0, 0)
+    offset = getattr(screen, 'pos', (0, 0))
+    count = [0]
+    pos = (offset[0] + button.pos[0] + button.image.get_width() // 2,
+           offset[1] + button.pos[1] + button.image.get_height() // 2)
+    get_events = type(screen).get_events
+
+    def clicking(clock):
+        count[0] += 1
+        if count[0] % frames == 0:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEBUTTONUP, pos=pos, button=1))
+        return get_events(screen, clock)
+    screen.get_events = clicking
+    screen.set_frame_policy('uncapped')
+
+
+def button_text(screen, params):
+    def op():
+        ptg.Button(0, 'Play', (10, 10))
+    return op
+
+
+def button_picture(screen, params):
+    file = picture()
+
+    def op():
+        ptg.Button(1, file, (10, 10), resize=(48, 48))
+    return op
+
+
+def linesoftext(screen, params):
+    lines = ['Line %d of the text' % i for i in range(params['lines'])]
+
+    def op():
+        ptg.Linesoftext(lines, (0, 0))
+    return op
+
+
+def menu_frame(screen, params):
+    buttons = [['Button %d' % i, lambda: 1] for i in range(params['buttons'])]
+    menu = ptg.Menu(SIZE, (40, 40, 40), ['Benchmark'], buttons)
+    frames = params['frames']
+    click(menu, menu.buttonlist[0], frames)
+    clock = pygame.time.Clock()
+
+    def op():
+        menu.update(screen, clock)
+        return frames
+    return op
+
+
+def tilelist(params):
+    file = picture()
+    size = (SIZE[0] // params['columns'], SIZE[1] // params['rows'])
+    return pttt.Tilelist([[pttt.Tile(file, size)
+                           for j in range(params['rows'])]
+                          for i in range(params['columns'])])
+
+
+def tilemap_build(screen, params):
+    tiles = tilelist(params)
+
+    def op():
+        pttt.Tilemap(SIZE, tiles, 1)
+    return op
+
+
+def adjacent_tiles(screen, params):
+    tiles = tilelist(params)
+    flat = [j for i in tiles for j in i]
+
+    def op():
+        for tile in flat:
+            tiles.adjacent_tiles(tile, 'b')
+        return len(flat)
+    return op
+
+
+def toggle_shade(screen, params):
+    tiles = tilelist(params)
+    tilemap = pttt.Tilemap(SIZE, tiles, 1)
+    flat = [j for i in tiles for j in i]
+
+    def op():
+        for tile in flat:
+            tile.toggle_shade('red')
+        tilemap.prepare_frame()
+        return len(flat)
+    return op
+
+
+def textscreens_flip(screen, params):
+    text = [['Page %d' % i, 'Some text on the page'] for i in
+            range(params['pages'])]
+    pages = ptg.Textscreens(SIZE, (40, 40, 40), text, ['Done', lambda: 1])
+    click(pages, pages.nextbutton)
+    clock = pygame.time.Clock()
+
+    def op():
+        # Flip forward through every page but the last
+        for i in range(len(text) - 1):
+            pages.Screens(text[i], pages.page_type(i), screen, clock)
+        return len(text) - 1
+    return op
+
+
+# The benchmarks run by the suite
+benchmarks = [
+    Benchmark('button_text', button_text),
+    Benchmark('button_picture', button_picture),
+    Benchmark('linesoftext', linesoftext, {'lines': 10}),
+    Benchmark('menu_frame', menu_frame, {'buttons': 20, 'frames': 50}),
+    Benchmark('tilemap_build', tilemap_build, {'columns': 100, 'rows': 75}),
+    Benchmark('adjacent_tiles', adjacent_tiles, {'columns': 100, 'rows': 75}),
+    Benchmark('toggle_shade', toggle_shade, {'columns': 100, 'rows': 75}),
+    Benchmark('textscreens_flip', textscreens_flip, {'pages': 10}),
+]
+
+
+def run(names=None, mintime=0.5, report=None):
+    """This function runs the benchmarks and returns the results.
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Inputs:
+        names - This is a list of the names of the benchmarks to run. By
+            default every benchmark is run.
+
+        mintime - This is the least number of seconds each benchmark is
+            repeated for.
+
+        report - If a function is given it is called with the name and result
+            of each benchmark as it finishes.
+
+    The results are a dictionary holding information about the machine under
+    'meta' and a dictionary of the result of each benchmark under 'results'.
+
+    (doc string updated ver 0.2)
+    """
+
+    screen = setup_display()
+    results = {}
+    for benchmark in benchmarks:
+        if names and benchmark.name not in names:
+            continue
+        results[benchmark.name] = benchmark.measure(screen, mintime)
+        if report is not None:
+            report(benchmark.name, results[benchmark.name])
+
+    meta = {'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+    if resource is not None:
+        # Kilobytes on Linux, bytes on macOS
+        meta['maxrss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'meta': meta, 'results': results}
+
+
+def compare(results, baseline, threshold=0.15, memory_threshold=0.25,
+            thresholds=None):
+    """This function compares results against a baseline and returns a list of
+    [name, measure, baseline value, new value, change, regressed] lists.
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Inputs:
+        results - These are the results returned by run.
+
+        baseline - These are earlier results, such as from load_results.
+
+        threshold - This is the fraction that the operations per second may
+            drop by before it counts as a regression. The default is 0.15.
+
+        memory_threshold - This is the fraction that the peak memory may grow
+            by before it counts as a regression. The default is 0.25.
+
+        thresholds - This is a dictionary of speed thresholds for single
+            benchmarks keyed by name.
+
+    Benchmarks that are missing from either results are skipped.
+
+    (doc string updated ver 0.2)
+    """
+
+    thresholds = thresholds or {}
+    rows = []
+    for name, new in results['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+
+        speed = new['ops_per_sec'] / old['ops_per_sec'] - 1
+        rows.append([name, 'ops_per_sec', old['ops_per_sec'],
+                     new['ops_per_sec'], speed,
+                     speed < -thresholds.get(name, threshold)])
+
+        if old['peak_bytes']:
+            memory = new['peak_bytes'] / old['peak_bytes'] - 1
+            rows.append([name, 'peak_bytes', old['peak_bytes'],
+                         new['peak_bytes'], memory,
+                         memory > memory_threshold])
+    return rows
+
+
+def save_results(results, file):
+    """Write results to a JSON file."""
+    with open(file, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+
+def load_results(file):
+    """Read results from a JSON file."""
+    with open(file) as f:
+        return json.load(f)
@@ -0,0 +1,80 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.bench.__main__.py
+# Purpose:     This runs the benchmark suite from the command line
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Examples
+#     python -m pygame_toolbox.bench
+#     python -m pygame_toolbox.bench --output baseline.json
+#     python -m pygame_toolbox.bench --baseline baseline.json --threshold 0.1
+#     python -m pygame_toolbox.bench --only tilemap_build --set-threshold \
+#         tilemap_build=0.3
+# The exit status is 1 if anything regressed past its threshold.
+
+from . import benchmarks, compare, load_results, run, save_results
+import argparse
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pygame_toolbox.bench',
+        description='Time the hot paths of pygame_toolbox.')
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        choices=[i.name for i in benchmarks],
+                        help='run only this benchmark (can be repeated)')
+    parser.add_argument('--mintime', type=float, default=0.5,
+                        help='seconds to repeat each benchmark for')
+    parser.add_argument('--output', metavar='FILE',
+                        help='save the results to a JSON file')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed drop in ops/sec as a fraction')
+    parser.add_argument('--memory-threshold', type=float, default=0.25,
+                        help='allowed growth in peak memory as a fraction')
+    parser.add_argument('--set-threshold', action='append', default=[],
+                        metavar='NAME=FRACTION',
+                        help='allowed drop in ops/sec for one benchmark')
+    args = parser.parse_args(argv)
+
+    thresholds = {}
+    for i in args.set_threshold:
+        name, sep, value = i.partition('=')
+        if not sep:
+            parser.error('--set-threshold needs NAME=FRACTION')
+        thresholds[name] = float(value)
+
+    def report(name, result):
+        print('%-18s %14.1f ops/sec %12d peak bytes' % (
+            name, result['ops_per_sec'], result['peak_bytes']))
+        sys.stdout.flush()
+
+    results = run(args.only, args.mintime, report)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.threshold,
+                       args.memory_threshold, thresholds)
+        print()
+        for name, measure, old, new, change, regressed in rows:
+            print('%-18s %-12s %14.1f -> %14.1f %+7.1f%%%s' % (
+                name, measure, old, new, change * 100,
+                '  REGRESSION' if regressed else ''))
+        if any(i[5] for i in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,11 +20,17 @@
 #   Textscreens
 #   Eventhandler
 
+from .assets import load_image, load_sound, new_surface, render_text
+from . import hittest
+from collections import OrderedDict
 import pygame
 import sys
 
 
-class Button:
+class Button(pygame.sprite.DirtySprite):
+    # The position of the screen the button is on, set by set_offset
+    offset = (0, 0)
+
     def __init__(self, type_of_button, file_or_text, position, midpoint=None,
                  surface=None, **kargs):
         """This class will help make quick buttons for use with pygame.
@@ -37,7 +43,8 @@ class Button:
 
             file_or_text - This input is a string containing either the text for
                 a text button or a file name for the picture button (include
-                extension for picture files such as .png)
+                extension for picture files such as .png). Picture buttons also
+                accept a region of an Atlas from the assets module.
 
             position - This is the x, y position of the top left corner of the
                 button. (defining point can be changed to midpoint)
@@ -69,28 +76,40 @@ class Button:
             sound - This can be a string of a sound file. If given the sound
                 will play whenever the button is clicked.
 
+            layer - This is the layer the button is drawn on when it is in a
+                LayeredDirty sprite group. Higher layers are drawn on top. The
+                default is 0.
+
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         Important Attributes:
             image - This will be the pygame surface that contains the image
-                of the button to be blitted onto another surface.
+                of the button to be blitted onto another surface. Picture
+                buttons share their image with every other user of the same
+                file and size through the asset cache, so copy it before
+                drawing on it.
 
             pos - This is a tuple of the x, y cordinates of the button for
                 blitting purposes.
 
             rect - This is a pygame rectangle object associated with the
-                size and position of the button. This is used for collision
-                detection with the mouse.
+                size and position of the button on the display, including the
+                offset of the screen it is on. This is used for collision
+                detection with the mouse and by pygame sprite groups.
+
+            dirty - The button is a pygame DirtySprite. This is set to 1 when
+                the button redraws itself so screens and LayeredDirty groups
+                know to draw it again.
 
             blitinfo - This is a tuple containing the image and the position
                 of the button. This can be unpacked into the blit method for
                 convenience.
 
-        (doc string updated ver 0.1)
+        (doc string updated ver 0.2)
         """
 
-        # Initialize pygame font and sprite class
-        pygame.sprite.Sprite.__init__(self)
-        pygame.font.init()
+        # Initialize the sprite class
+        pygame.sprite.DirtySprite.__init__(self)
+        self.dirty = 0
 
         # Unpack the **kargs dictionary into the possible inputs (resize,
         # fontsize and func). If there are still items in kargs return
@@ -100,27 +119,25 @@ class Button:
         func = kargs.pop('func', None)
         background = kargs.pop('background', (67, 110, 238))
         sound = kargs.pop('sound', None)
+        self._layer = kargs.pop('layer', 0)
         if kargs:
             raise KeyError('An invalid input was passed')
 
         # Create a text button
         if type_of_button == 0:
 
-            # Create the font object
-            basicfont = pygame.font.Font(None, fontsize)
-
-            # Create the text surface and find the size and midpoint
-            # of that surface
-            text = basicfont.render(file_or_text, 0, (1, 1, 1))
+            # Create the text surface through the shared text cache and find
+            # the size and midpoint of that surface
+            text = render_text(file_or_text, fontsize)
             textsize = text.get_size()
             textmidp = (int(textsize[0] * 0.5), int(textsize[1] * 0.5))
 
             # Create the background box
             if resize:
-                self.image = pygame.Surface(resize)
+                self.image = new_surface(resize)
             else:
-                self.image = pygame.Surface((int(textsize[0] * 1.25),
-                                             int(textsize[1] * 1.429)))
+                self.image = new_surface((int(textsize[0] * 1.25),
+                                          int(textsize[1] * 1.429)))
             imagesize = self.image.get_size()
             imagemidp = (int(imagesize[0] * 0.5), int(imagesize[1] * 0.5))
 
@@ -128,10 +145,7 @@ class Button:
             # If the backround is a filename load the file and blit it
             # to the image
             if type(background) == str:
-                background = pygame.image.load(background).convert()
-                background = pygame.transform.scale(background,
-                                                    (self.image.get_width(),
-                                                     self.image.get_height()))
+                background = load_image(background, self.image.get_size())
                 self.image.blit(background, (0, 0))
             # Otherwise the background should contain an rgb value
             else:
@@ -144,12 +158,9 @@ class Button:
         # Create a picture button
         elif type_of_button == 1:
 
-            # Load the given file
-            self.image = pygame.image.load(file_or_text).convert()
-
-            # Change the size of the picture if necessary
-            if resize:
-                self.image = pygame.transform.scale(self.image, resize)
+            # Load the given file at the requested size. The image is shared
+            # through the asset cache with every other user of the same file.
+            self.image = load_image(file_or_text, resize or None)
             imagemidp = (int(self.image.get_width() * 0.5),
                          int(self.image.get_height() * 0.5))
 
@@ -160,9 +171,10 @@ class Button:
         if func is not None:
             self.func = func
 
-        # If a sound is given load the sound file
+        # If a sound is given load the sound file. The sound is shared with
+        # every other button using the same file.
         if sound is not None:
-            self.sound = pygame.mixer.Sound(sound)
+            self.sound = load_sound(sound)
         else:
             self.sound = None
 
@@ -192,15 +204,20 @@ class Button:
         else:
             self.pos = position
 
-        # set the rectangle to be used for collision detection
-        self.rect = pygame.Rect(self.pos, self.image.get_size())
+        # set the rectangle to be used for collision detection, on the display
+        self.rect = pygame.Rect((self.pos[0] + self.offset[0],
+                                 self.pos[1] + self.offset[1]),
+                                self.image.get_size())
+        hittest.moved()
 
         # Set up the information that is needed to blit the image to the surface
         self.blitinfo = (self.image, self.pos)
 
-        # automatically blit the button onto an input surface
+        # automatically blit the button onto an input surface and report that
+        # the button redrew itself
         if surface:
             surface.blit(*self.blitinfo)
+            self.dirty = 1
 
     def __call__(self):
         """Calling the button will call what ever function was passed to it when
@@ -255,73 +272,120 @@ class Linesoftext:
                 of the text. This can be unpacked into the blit method for
                 convenience.
 
-        (doc string updated ver 0.1)
-        """
+            text - This is the list of lines currently drawn. Use the set_text
+                method to change it.
 
-        # Initialize the pygame font class.
-        pygame.font.init()
+        (doc string updated ver 0.2)
+        """
 
         # Unpack the **kargs dictionary
-        fontsize = kargs.pop('fontsize', 36)
-        align = kargs.pop('align', 'l')
-
-        # Create the font object
-        basicfont = pygame.font.Font(None, fontsize)
-
-        # Figure out the size of the image that will be drawn on and create that
-        # image
-        linewidths = []
-        for x in text:
-            texttemp = basicfont.render(x, 0, (1, 1, 1))
-            linewidths.append(texttemp.get_width())
-        # The width of the image is the width of the text that corresponds to
-        # the index of linewidths that contains the largest number in linewidths
-        maxlinewidth = linewidths.index(max(linewidths))
-        maxlinerender = basicfont.render(text[maxlinewidth], 0, (1, 1, 1))
-        self.imagewidth = maxlinerender.get_width()
-        self.imageheight = len(text) * fontsize + (len(text)-1) * 10
-        self.image = pygame.Surface((self.imagewidth, self.imageheight))
+        self.fontsize = kargs.pop('fontsize', 36)
+        self.align = kargs.pop('align', 'l')
+
+        # Keep the position information so the text can be laid out again
+        self.position = position
+        self.xmid = xmid
+
+        # Render each line once and draw the lines to the image
+        self.text = []
+        self.lineimages = []
+        self.layout(text)
+
+        # automatically blit the text onto an input surface
+        if surface:
+            surface.blit(*self.blitinfo)
+
+    def layout(self, text):
+        """This method renders every line of the text once, measures the line
+        boxes from those renders and draws each line to a new image.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            text - This is a list of strings. Each item in the list will be
+                drawn on a separate line.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.text = list(text)
+        self.lineimages = [render_text(x, self.fontsize) for x in self.text]
+
+        # The width of the image is the width of the widest line
+        self.imagewidth = max(x.get_width() for x in self.lineimages)
+        self.imageheight = (len(self.text) * self.fontsize +
+                            (len(self.text) - 1) * 10)
+        self.image = new_surface((self.imagewidth, self.imageheight))
         self.image.fill((200, 200, 200))
 
-        # make the background transparent
+        # make the background transparent. RLE acceleration is not used since
+        # set_text draws into the image and would have to re-encode it.
         self.image.set_colorkey((200, 200, 200))
 
         # Draw the text to the image using the user chosen alignment
-        n = 0
-        if align == 'l':
-            for x in text:
-                texttemp = basicfont.render(x, 0, (1, 1, 1))
-                self.image.blit(texttemp, (0, n * fontsize + n * 10))
-                n += 1
-        elif align == 'c':
-            for x in text:
-                texttemp = basicfont.render(x, 0, (1, 1, 1))
-                self.image.blit(texttemp,
-                                (self.imagewidth//2 - texttemp.get_width()//2,
-                                 n * fontsize + n * 10))
-                n += 1
-        elif align == 'r':
-            for x in text:
-                texttemp = basicfont.render(x, 0, (1, 1, 1))
-                self.image.blit(texttemp,
-                                (self.imagewidth - texttemp.get_width(),
-                                 n * fontsize + n * 10))
-                n += 1
+        for n in range(len(self.text)):
+            self.draw_line(n)
 
         # Set the position of the text. If xmid is passed in as true set the
         # pos to the top middle pixel of the text
-        if xmid:
-            self.pos = (position[0]-int(self.image.get_width()/2), position[1])
+        if self.xmid:
+            self.pos = (self.position[0] - int(self.imagewidth / 2),
+                        self.position[1])
         else:
-            self.pos = position
+            self.pos = self.position
 
         # Set up the information that will be needed to blit the image to a
         # surface
         self.blitinfo = (self.image, self.pos)
 
-        # automatically blit the text onto an input surface
-        if surface:
-            surface.blit(*self.blitinfo)
+    def draw_line(self, n):
+        """Draw the already rendered line n to its box in the image."""
+        texttemp = self.lineimages[n]
+        if self.align == 'c':
+            x = self.imagewidth//2 - texttemp.get_width()//2
+        elif self.align == 'r':
+            x = self.imagewidth - texttemp.get_width()
+        else:
+            x = 0
+        self.image.blit(texttemp, (x, n * self.fontsize + n * 10))
+
+    def set_text(self, text):
+        """This method changes the text and re-renders only the lines that
+        changed. If the number of lines or the width of the widest line
+        changes the whole image is laid out again.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            text - This is a list of strings. Each item in the list will be
+                drawn on a separate line.
+
+        (doc string updated ver 0.2)
+        """
+
+        text = list(text)
+        if len(text) != len(self.text):
+            self.layout(text)
+            return
+
+        # Render the lines that changed
+        changed = [n for n in range(len(text)) if text[n] != self.text[n]]
+        if not changed:
+            return
+        lineimages = list(self.lineimages)
+        for n in changed:
+            lineimages[n] = render_text(text[n], self.fontsize)
+
+        # A new widest line moves every centered or right aligned line so the
+        # image has to be laid out again
+        if max(x.get_width() for x in lineimages) != self.imagewidth:
+            self.layout(text)
+            return
+
+        # Clear and redraw only the boxes of the changed lines
+        self.text = text
+        self.lineimages = lineimages
+        for n in changed:
+            self.image.fill((200, 200, 200),
+                            (0, n * self.fontsize + n * 10, self.imagewidth,
+                             self.fontsize + 10))
+            self.draw_line(n)
 
     def test(self, windowsize=False):
         """This can be used to quickly test the spacing of the words.
@@ -357,6 +421,25 @@ class Linesoftext:
 
 
 class BaseScreen:
+    # Dirty rectangle rendering is off unless set_dirty_mode is called
+    dirtymode = False
+
+    # The update loops run at a fixed 30 frames per second unless
+    # set_frame_policy is called
+    framemode = 'fixed'
+    framerate = 30
+    idletimeout = 1000
+
+    # Frames are only timed after instrument.enable is called
+    profiler = None
+
+    # Events come from the pygame queue unless a recorder or player from the
+    # replay module is installed
+    eventsource = None
+
+    # The LayeredDirty group used when set_sprite_mode is turned on
+    sprites = None
+
     def __init__(self, size, background=None, music=None):
         """This is a base class for the other screens offered in the pygametools
         module.
@@ -371,14 +454,12 @@ class BaseScreen:
         """
 
         # Create the image that the screen will be drawn on
-        self.image = pygame.Surface((size[0], size[1]))
+        self.image = new_surface((size[0], size[1]))
 
         # Create the background for the screen
         # If the backround is a filename load the file and blit it to the image
         if type(background) == str:
-            background = pygame.image.load(background).convert()
-            background = pygame.transform.scale(background, size)
-            self.image.blit(background, (0, 0))
+            self.image.blit(load_image(background, size), (0, 0))
         # Otherwise the background should contain an rgb value
         elif type(background) == tuple:
             self.image.fill(background)
@@ -393,6 +474,11 @@ class BaseScreen:
         else:
             self.music = None
 
+        # Regions of the image that changed since the last frame. A new image
+        # is always presented in full.
+        self.dirty_rects = []
+        self.fullredraw = True
+
     def set_offset(self, offset, mid=None):
         """This method will allow the menu to be placed anywhere in the open
            window instead of just the upper left corner.
@@ -427,16 +513,324 @@ class BaseScreen:
 
         self.pos = offset
 
-        for i in self.buttonlist:
-                i.rect[0] += offset[0]
-                i.rect[1] += offset[1]
+        # Move the display rects of the buttons and widgets with the screen
+        for i in self.buttonlist + getattr(self, 'widgetlist', []):
+            i.offset = offset
+            i.rect.topleft = (i.pos[0] + offset[0], i.pos[1] + offset[1])
 
-        try:
-            for i in self.widgetlist:
-                i.rect[0] += offset[0]
-                i.rect[1] += offset[1]
-        except AttributeError:
-            pass
+        # The screen moved so it has to be presented in full
+        self.fullredraw = True
+
+    def set_dirty_mode(self, dirtymode=True):
+        """This method turns dirty rectangle rendering on or off. When it is on
+        the update loop only presents the regions of the screen that changed
+        instead of blitting the whole image and flipping the display.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            dirtymode - True to only present changed regions, False to present
+                the whole screen every frame.
+
+        Buttons, tiles and widgets set their dirty attribute when they redraw
+        themselves and the screen collects their rectangles each frame. Any
+        other drawing done on self.image should be reported with mark_dirty.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.dirtymode = dirtymode
+        self.fullredraw = True
+
+    def set_sprite_mode(self, spritemode=True):
+        """This method turns drawing through a pygame LayeredDirty sprite
+        group on or off. When it is on the buttons, widgets (and tiles of a
+        Tilemap) are drawn straight to the display by the group, which only
+        redraws the sprites that are dirty and what they overlap.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            spritemode - True to draw through the group, False to go back to
+                presenting the screen image.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            sprites - The LayeredDirty group. Sprites added to it later are
+                drawn the same way, on the layer given by their layer
+                attribute.
+
+        The group clears sprites with a background made from a copy of the
+        display with the screen image on it. Other drawing on self.image that
+        is reported with mark_dirty is copied into the background.
+
+        The group is made again whenever the button list or widget list is
+        replaced or changes length, such as when a widget runs
+        Menu.__init__ again or Textscreens shows another page. Sprites
+        swapped into a list in place should be added to the group by hand.
+
+        (doc string updated ver 0.2)
+        """
+
+        if spritemode:
+            self.sprites = pygame.sprite.LayeredDirty(self.sprite_list())
+            self.spritekey = self.sprite_key()
+        else:
+            self.sprites = None
+        self.fullredraw = True
+
+    def sprite_list(self):
+        """Return the sprites drawn by the group in sprite mode."""
+        return self.buttonlist + getattr(self, 'widgetlist', [])
+
+    def sprite_key(self):
+        # Changes when the lists the sprites come from are replaced or resized
+        lists = (getattr(self, 'buttonlist', None),
+                 getattr(self, 'widgetlist', None))
+        return tuple((id(i), len(i) if i is not None else 0) for i in lists)
+
+    def set_frame_policy(self, framemode='fixed', framerate=30,
+                         idletimeout=1000):
+        """This method sets how the update loop waits between frames.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            framemode - This determines how the loop waits for the next frame.
+                'fixed' = tick the clock at framerate frames per second and
+                    redraw every frame (default)
+                'uncapped' = run as fast as possible, useful for benchmarking
+                'event' = sleep until an event arrives (including timers set
+                    with pygame.time.set_timer) and only redraw after one does
+
+            framerate - The frames per second used by the 'fixed' mode. The
+                default is 30.
+
+            idletimeout - The longest time in milliseconds the 'event' mode
+                will sleep before running an empty frame. None sleeps until an
+                event arrives. The default is 1000.
+
+        (doc string updated ver 0.2)
+        """
+
+        if framemode not in ('fixed', 'uncapped', 'event'):
+            raise ValueError('An invalid frame mode was passed')
+        self.framemode = framemode
+        self.framerate = framerate
+        self.idletimeout = idletimeout
+
+    def get_events(self, clock):
+        """Wait for the next frame using the frame policy and return the list
+        of events that arrived."""
+        if self.profiler is not None:
+            self.profiler.begin_frame()
+            events = self.read_events(clock)
+            self.profiler.stop('wait')
+            self.profiler.count('events', len(events))
+            return events
+        return self.read_events(clock)
+
+    def read_events(self, clock):
+        # A recorder or player from the replay module stands in for the
+        # event queue when one is installed
+        if self.eventsource is not None:
+            return self.eventsource.get_events(self, clock)
+        return self.wait_events(clock)
+
+    def wait_events(self, clock):
+        """Wait for the next frame and read the pygame event queue."""
+        if self.framemode == 'event':
+            if self.idletimeout is None:
+                event = pygame.event.wait()
+            else:
+                event = pygame.event.wait(self.idletimeout)
+            clock.tick()
+            if event.type == pygame.NOEVENT:
+                return []
+            return [event] + pygame.event.get()
+        elif self.framemode == 'uncapped':
+            clock.tick()
+        else:
+            clock.tick(self.framerate)
+        return pygame.event.get()
+
+    def needs_redraw(self, events):
+        """Return True if the frame should be presented. In the 'event' frame
+        mode a frame without events is not drawn."""
+        return bool(events) or self.framemode != 'event' or self.fullredraw
+
+    def hit_test(self, pos, widgets=False):
+        """This method returns the topmost button under a position on the
+        display, or None if there is no button there.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            pos - This is the x, y position on the display, such as the pos
+                attribute of a mouse event.
+
+            widgets - If True the widget list is searched instead of the button
+                list.
+
+        The buttons are found from a grid of their positions in the screen
+        image, so the result stays correct after set_offset. The grid is
+        rebuilt whenever a button is positioned or the lists change length.
+
+        (doc string updated ver 0.2)
+        """
+
+        key = (hittest.generation, id(self.buttonlist), len(self.buttonlist),
+               id(getattr(self, 'widgetlist', None)),
+               len(getattr(self, 'widgetlist', ())))
+        if getattr(self, 'hitkey', None) != key:
+            self.buttongrid = hittest.Hitgrid(self.buttonlist)
+            self.widgetgrid = hittest.Hitgrid(getattr(self, 'widgetlist', []))
+            self.hitkey = key
+
+        grid = self.widgetgrid if widgets else self.buttongrid
+        if self.profiler is not None:
+            self.profiler.start('hit')
+            found = grid.query((pos[0] - self.pos[0], pos[1] - self.pos[1]))
+            self.profiler.stop('hit')
+            return found
+        return grid.query((pos[0] - self.pos[0], pos[1] - self.pos[1]))
+
+    def idle(self):
+        """Called by the update loop once a frame after the frame has been
+        presented. Subclasses can override it to do work ahead of time."""
+        pass
+
+    def mark_dirty(self, rect):
+        """Report a region of self.image (in image coordinates) that changed
+        and needs to be presented on the next frame."""
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def collect_dirty(self):
+        """Mark the regions of any buttons or widgets that redrew themselves
+        since the last frame."""
+        for i in (getattr(self, 'buttonlist', []) +
+                  getattr(self, 'widgetlist', [])):
+            if getattr(i, 'dirty', 0):
+                self.mark_dirty((i.pos, i.image.get_size()))
+                i.dirty = 0
+
+    def present(self, screen):
+        """This method draws the screen image to the display. In dirty mode
+        only the changed regions are blitted and passed to
+        pygame.display.update, and nothing is done on an idle frame.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            screen - This is the pygame display the screen is drawn on.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            blitted_pixels - The number of pixels blitted on the last frame.
+
+            presented_pixels - The number of display pixels sent to the
+                screen on the last frame.
+
+        (doc string updated ver 0.2)
+        """
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start('blit')
+        if self.sprites is not None:
+            self.present_sprites(screen)
+            if profiler is not None:
+                profiler.stop('blit')
+            return
+
+        # Present the whole image when not in dirty mode or when the image or
+        # its position changed since it was last presented
+        if (not self.dirtymode or self.fullredraw or
+                self.image is not getattr(self, 'presented_image', None)):
+            screen.blit(self.image, self.pos)
+            if profiler is not None:
+                if profiler.overlay:
+                    profiler.draw_overlay(screen)
+                profiler.stop('blit')
+                profiler.count('blits')
+                profiler.start('flip')
+            pygame.display.flip()
+            if profiler is not None:
+                profiler.stop('flip')
+            imagesize = self.image.get_size()
+            self.blitted_pixels = imagesize[0] * imagesize[1]
+            self.presented_pixels = screen.get_width() * screen.get_height()
+            self.presented_image = self.image
+            self.fullredraw = False
+            self.dirty_rects = []
+            if self.dirtymode:
+                self.collect_dirty()
+                self.dirty_rects = []
+            return
+
+        # Otherwise present only the regions that changed, in one batch
+        self.collect_dirty()
+        bounds = self.image.get_rect()
+        rects = []
+        for i in self.dirty_rects:
+            i = i.clip(bounds)
+            if i.width and i.height and i not in rects:
+                rects.append(i)
+        self.dirty_rects = []
+
+        # Cover the old overlay with the image so it can be drawn again
+        overlay = profiler is not None and profiler.overlay
+        if overlay and profiler.overlayrect is not None:
+            i = profiler.overlayrect.move(-self.pos[0], -self.pos[1]).clip(
+                bounds)
+            if i.width and i.height and i not in rects:
+                rects.append(i)
+
+        screenrects = screen.blits([(self.image, i.move(self.pos), i)
+                                    for i in rects])
+        if profiler is not None:
+            if overlay:
+                rect = profiler.draw_overlay(screen)
+                if rect is not None:
+                    screenrects.append(rect)
+            profiler.stop('blit')
+            profiler.count('blits', len(rects))
+            profiler.start('flip')
+        if screenrects:
+            pygame.display.update(screenrects)
+        if profiler is not None:
+            profiler.stop('flip')
+        self.blitted_pixels = sum(i.width * i.height for i in rects)
+        self.presented_pixels = sum(i.width * i.height for i in screenrects)
+
+    def present_sprites(self, screen):
+        # Draw the frame through the sprite group of sprite mode, making the
+        # group again if the buttons or widgets were replaced
+        if self.sprite_key() != getattr(self, 'spritekey', None):
+            self.set_sprite_mode(True)
+        screenrect = screen.get_rect()
+        if (self.fullredraw or
+                self.image is not getattr(self, 'presented_image', None) or
+                getattr(self, 'spritebackground', None) is None or
+                self.spritebackground.get_size() != screen.get_size()):
+            # Make the background the group clears sprites with and draw
+            # every sprite on it
+            self.spritebackground = screen.copy()
+            self.spritebackground.blit(self.image, self.pos)
+            self.sprites.repaint_rect(screenrect)
+            self.presented_image = self.image
+            self.fullredraw = False
+            self.dirty_rects = []
+            full = True
+        else:
+            # Copy drawing reported with mark_dirty into the background
+            for i in self.dirty_rects:
+                i = i.move(self.pos)
+                self.spritebackground.blit(self.image, i,
+                                           i.move(-self.pos[0], -self.pos[1]))
+                self.sprites.repaint_rect(i)
+            self.dirty_rects = []
+            full = False
+
+        rects = self.sprites.draw(screen, self.spritebackground)
+        if full:
+            pygame.display.flip()
+            self.presented_pixels = screenrect.width * screenrect.height
+        else:
+            if rects:
+                pygame.display.update(rects)
+            self.presented_pixels = sum(i.width * i.height for i in rects)
+        self.blitted_pixels = self.presented_pixels
 
 
 class Menu(BaseScreen):
@@ -465,7 +859,13 @@ class Menu(BaseScreen):
                 automatically check if they're clicked in its update function
                 (you need to blit the added button to self.image manually)
 
-        (doc string updated ver 0.1)
+            widgetlist - Widgets added to this list are called with the menu
+                when they are clicked.
+
+            mouse_event - This is the mouse event that called the current
+                widget, so a widget can read its pos and button.
+
+        (doc string updated ver 0.2)
         """
 
         # Initialize the screen class
@@ -479,12 +879,12 @@ class Menu(BaseScreen):
         # Create the header text
         Linesoftext(header, (xmid, 40), xmid=True, surface=self.image)
 
-        # Create the buttons
+        # Create the buttons and draw them in one batch
         self.buttonlist = []
-        for i in buttons:
-            self.buttonlist += [Button(0, i[0],
-                                       (xmid, ybuth + buttons.index(i) * 50),
-                                       True, surface=self.image, func=i[1])]
+        for n, i in enumerate(buttons):
+            self.buttonlist += [Button(0, i[0], (xmid, ybuth + n * 50), True,
+                                       func=i[1])]
+        self.image.blits([i.blitinfo for i in self.buttonlist], False)
 
         # Create an empty list of widgets
         self.widgetlist = []
@@ -504,16 +904,20 @@ class Menu(BaseScreen):
         if self.music is not None:
             pygame.mixer.music.play(-1)
 
+        # The screen may have been covered since it was last shown so the
+        # first frame is always presented in full
+        self.fullredraw = True
+
         while True:
-            clock.tick(30)
-            for event in pygame.event.get():
+            events = self.get_events(clock)
+            for event in events:
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
                 # Check if any of the buttons were clicked
-                for i in self.buttonlist:
-                    if (event.type == pygame.MOUSEBUTTONUP and
-                            i.rect.collidepoint(pygame.mouse.get_pos())):
+                if event.type == pygame.MOUSEBUTTONUP:
+                    i = self.hit_test(event.pos)
+                    if i is not None:
                         if self.music is not None:
                             pygame.mixer.music.stop()
                         if self.widgetlist:
@@ -521,14 +925,15 @@ class Menu(BaseScreen):
                         else:
                             return i()
                 # If there is a widget list, check to see if any were clicked
-                if self.widgetlist:
-                    for i in self.widgetlist:
-                        if (event.type == pygame.MOUSEBUTTONDOWN and
-                                i.rect.collidepoint(pygame.mouse.get_pos())):
-                            # Call the widget and give it the menu information
-                            i(self)
-            screen.blit(self.image, self.pos)
-            pygame.display.flip()
+                elif event.type == pygame.MOUSEBUTTONDOWN and self.widgetlist:
+                    i = self.hit_test(event.pos, widgets=True)
+                    if i is not None:
+                        # Call the widget and give it the menu information
+                        self.mouse_event = event
+                        i(self)
+            if self.needs_redraw(events):
+                self.present(screen)
+            self.idle()
 
 
 class Textscreens(BaseScreen):
@@ -573,8 +978,14 @@ class Textscreens(BaseScreen):
         self.text = text
         self.lastbutton_func = lastbutton[1]
         self.music = music
+        self.pagemusic = music
         self.widgetlist = []
 
+        # Drawn pages keyed by their text and page type. The least recently
+        # shown pages are dropped past maxpages.
+        self.pages = OrderedDict()
+        self.maxpages = 8
+
         # Set the progress counter for the text and page indicator for the
         # individual screens
         self.progress = 0
@@ -607,41 +1018,100 @@ class Textscreens(BaseScreen):
 
     def Screens(self, text, prog, screen, clock):
         """Prog = 0 for first page, 1 for middle pages, 2 for last page"""
-        # Initialize the screen class
-        BaseScreen.__init__(self, self.size, self.background)
-
-        # Determine the mid position of the given screen size and the
-        # y button height
-        xmid = self.size[0]//2
+        # Reset the screen the same way as initializing the screen class
+        # would, but take the page image from the page cache
+        self.pos = (0, 0)
+        self.music = None
+        self.dirty_rects = []
+        self.fullredraw = True
+        self.image = self.render_page(text, prog)
+        self.buttonlist = self.page_buttons(prog)
+        if self.sprites is not None:
+            self.set_sprite_mode(True)
 
-        # Create the header text
-        Linesoftext(text, (xmid, 40), xmid=True, surface=self.image,
-                    fontsize=30)
+        # Use the menu update method to run the screen and process button clicks
+        return Menu.update(self, screen, clock)
 
-        # Create the buttons
-        self.buttonlist = []
+    def page_type(self, progress):
+        """Return the prog value of a page: 0 for the first page, 1 for middle
+        pages and 2 for the last page."""
+        if progress == len(self.text) - 1:
+            return 2
+        elif progress == 0:
+            return 0
+        return 1
+
+    def page_buttons(self, prog):
+        """Return the list of buttons shown on a page of the given type."""
         if prog == 0:
-            self.buttonlist += [self.nextbutton]
-
+            return [self.nextbutton]
         elif prog == 1:
-            self.buttonlist += [self.nextbutton]
-            self.buttonlist += [self.backbutton]
-
+            return [self.nextbutton, self.backbutton]
         elif prog == 2:
-            self.buttonlist += [self.lastbutton]
-            self.buttonlist += [self.backbutton]
+            return [self.lastbutton, self.backbutton]
+        return []
+
+    def sprite_list(self):
+        """Return the buttons of the page being shown, or of the first page
+        if none has been shown yet."""
+        if not hasattr(self, 'buttonlist'):
+            return self.page_buttons(self.page_type(self.progress))
+        return self.buttonlist + self.widgetlist
+
+    def render_page(self, text, prog):
+        """This method returns the fully drawn image of a page, drawing it only
+        if it is not in the page cache.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            text - This is the list of lines of text on the page.
 
-        # Draw the buttons to the screen
-        for i in self.buttonlist:
-            self.image.blit(*i.blitinfo)
+            prog - This is the type of the page. (see page_type)
 
-        # Use the menu update method to run the screen and process button clicks
-        return Menu.update(self, screen, clock)
+        The page images are shared with the cache so they should not be drawn
+        on.
+
+        (doc string updated ver 0.2)
+        """
+
+        key = (tuple(text), prog)
+        page = self.pages.get(key)
+        if page is not None:
+            self.pages.move_to_end(key)
+            return page
+
+        # Draw the background
+        page = new_surface(self.size)
+        if type(self.background) == str:
+            page.blit(load_image(self.background, self.size), (0, 0))
+        elif type(self.background) == tuple:
+            page.fill(self.background)
+
+        # Create the header text
+        Linesoftext(text, (self.size[0]//2, 40), xmid=True, surface=page,
+                    fontsize=30)
+
+        # Draw the buttons to the page
+        page.blits([i.blitinfo for i in self.page_buttons(prog)], False)
+
+        self.pages[key] = page
+        while len(self.pages) > max(self.maxpages, 3):
+            self.pages.popitem(last=False)
+        return page
+
+    def idle(self):
+        # Draw one of the pages next to the current page ahead of time so
+        # flipping to it only costs a blit
+        for progress in (self.progress + 1, self.progress - 1):
+            if 0 <= progress < len(self.text):
+                prog = self.page_type(progress)
+                if (tuple(self.text[progress]), prog) not in self.pages:
+                    self.render_page(self.text[progress], prog)
+                    return
 
     def update(self, screen, clock):
         # If a music file was passed, start playing it on repeat
-        if self.music is not None:
-            pygame.mixer.music.load(self.music)
+        if self.pagemusic is not None:
+            pygame.mixer.music.load(self.pagemusic)
             pygame.mixer.music.play(-1)
             self.music_textscreens = 1
         else:
@@ -655,15 +1125,9 @@ class Textscreens(BaseScreen):
             # page = 4 - exit the set of pages
             if self.page == 1:
                 # check for last page then first page then make the middle pages
-                if self.progress == (len(self.text) - 1):
-                    self.page = self.Screens(self.text[self.progress], 2,
-                                             screen, clock)
-                elif self.progress == 0:
-                    self.page = self.Screens(self.text[self.progress], 0,
-                                             screen, clock)
-                else:
-                    self.page = self.Screens(self.text[self.progress], 1,
-                                             screen, clock)
+                self.page = self.Screens(self.text[self.progress],
+                                         self.page_type(self.progress),
+                                         screen, clock)
             elif self.page == 2:
                 self.progress += 1
                 self.page = 1
@@ -673,6 +1137,10 @@ class Textscreens(BaseScreen):
             elif self.page == 4:
                 if self.music_textscreens:
                     pygame.mixer.music.stop()
+
+                # Go back to the first page so the screens can be shown again
+                self.progress = 0
+                self.page = 1
                 return self.lastbutton_func()
 
 
@@ -691,7 +1159,10 @@ class Eventhandler:
             screen - This is the pygame pygame display that the event handler
                 should display items on.
 
-        (doc string updated ver 0.1.2)
+        The events list can be replaced or added to while the game runs. If an
+        entry is replaced in place call refresh so the change is seen.
+
+        (doc string updated ver 0.2)
         """
 
         # Set the initial self.progress value and initialize the pygame clock
@@ -703,10 +1174,30 @@ class Eventhandler:
         self.screen = screen
         self.events = events
 
+    def dispatch(self, progress):
+        """Return the function for a progress value. The events list is turned
+        into a dictionary the first time and again whenever the list is
+        replaced or changes length. Call refresh after replacing entries of
+        the list in place."""
+        key = (id(self.events), len(self.events))
+        if getattr(self, 'eventkey', None) != key:
+            self.eventtable = {}
+            for i in self.events:
+                self.eventtable.setdefault(i[0], i[1])
+            self.eventkey = key
+        try:
+            return self.eventtable[progress]
+        except KeyError:
+            raise KeyError('No event was given for progress %r' % (progress,))
+
+    def refresh(self):
+        """Make the next dispatch read the events list again, such as after
+        an entry was replaced in place."""
+        self.eventkey = None
+
     def update(self):
         while True:
-            for i in self.events:
-                # If the first item in the list matches the self.progress
-                # attribute then call the second item
-                if i[0] == self.progress:
-                    self.progress = i[1](self.screen, self.clock)
+            # Call the function whose number matches the self.progress
+            # attribute
+            self.progress = self.dispatch(self.progress)(self.screen,
+                                                         self.clock)
@@ -0,0 +1,557 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.graphics.assets.py
+# Purpose:     This module holds the shared caches used to load the images,
+#              fonts and text that the toolbox draws with
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Assetcache
+#   Fontcache
+#   Atlas
+#   Atlasregion
+#   Preloader
+#   load_image
+#   load_sound
+#   new_surface
+#   display_format
+#   get_font
+#   render_text
+#   assetcache
+#   fontcache
+#   soundcache
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+
+class Assetcache:
+    def __init__(self, budget=64 * 1024 * 1024):
+        """This class holds decoded and resized images so that the same file is
+        only loaded from disk once no matter how many buttons, screens or tiles
+        use it.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            budget - This is the number of bytes of surface memory the cache is
+                allowed to hold. When the budget is exceeded the least recently
+                used images are dropped. The default is 64 MB.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            hits - The number of loads that were answered from the cache.
+
+            misses - The number of loads that had to decode the file.
+
+            bytes - The number of bytes of surface memory currently held.
+
+        The surfaces handed out are shared between every user of the same
+        (file, size, mode) so they should be blitted from and not drawn on.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.budget = budget
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+    def load(self, file, size=None, mode='convert'):
+        """This method will return the image for the given file at the given
+        size, decoding and scaling it only if it is not already cached.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            file - This is a string of the picture file name including
+                extension, or a region of an Atlas.
+
+            size - If a (width, height) tuple is passed the image will be
+                scaled to that size.
+
+            mode - This determines how the image is converted after loading.
+                'convert' = convert to the display format (default)
+                'alpha' = convert to the display format with per pixel alpha
+                None = leave the image in the format it was loaded in
+
+        (doc string updated ver 0.2)
+        """
+
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+
+        # Regions of an atlas at their own size are views into the sheet
+        if isinstance(file, Atlasregion):
+            if size is None or size == file.surface.get_size():
+                return file.surface
+        key = (file, size, mode)
+
+        # Return the cached surface and mark it as the most recently used
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+
+        # Reuse the unscaled image if it is already held, otherwise load it
+        surface = self.surfaces.get((file, None, mode))
+        if isinstance(file, Atlasregion):
+            surface = file.surface
+        elif surface is None:
+            surface = pygame.image.load(file)
+            if mode == 'convert':
+                surface = surface.convert()
+            elif mode == 'alpha':
+                surface = surface.convert_alpha()
+            self.store((file, None, mode), surface)
+        if size is not None and surface.get_size() != size:
+            surface = pygame.transform.scale(surface, size)
+            self.store(key, surface)
+        return surface
+
+    def store(self, key, surface):
+        """Add a surface to the cache and drop the least recently used
+        surfaces until the cache is back under its budget."""
+        if key in self.surfaces:
+            self.bytes -= self.surface_bytes(self.surfaces.pop(key))
+        self.surfaces[key] = surface
+        self.bytes += self.surface_bytes(surface)
+
+        # Never evict the surface that was just added
+        while self.bytes > self.budget and len(self.surfaces) > 1:
+            oldkey, oldsurface = self.surfaces.popitem(last=False)
+            self.bytes -= self.surface_bytes(oldsurface)
+
+    def set_budget(self, budget):
+        """Change the byte budget of the cache, evicting surfaces if the cache
+        is now over budget."""
+        self.budget = budget
+        while self.bytes > self.budget and self.surfaces:
+            oldkey, oldsurface = self.surfaces.popitem(last=False)
+            self.bytes -= self.surface_bytes(oldsurface)
+
+    def clear(self):
+        """Empty the cache and reset the counters."""
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+    def stats(self):
+        """Return a dictionary of the cache counters."""
+        return {'hits': self.hits, 'misses': self.misses, 'bytes': self.bytes,
+                'budget': self.budget, 'entries': len(self.surfaces)}
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_pitch() * surface.get_height()
+
+
+class Fontcache:
+    def __init__(self, maxtexts=512):
+        """This class holds one font object for each font file and size along
+        with a bounded cache of text that has already been rendered.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            maxtexts - This is the number of rendered text surfaces that are
+                kept. When the limit is reached the least recently used text
+                is dropped. The default is 512.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            fonts - A dictionary of the font objects keyed by (file, size).
+
+            font_hits, font_misses - Counters for font lookups.
+
+            text_hits, text_misses - Counters for text renders. Every text
+                miss is one call to Font.render.
+
+        Rendered text surfaces are shared by every user of the same text, font
+        and color so they should be blitted from and not drawn on. The fonts
+        and texts are dropped when pygame quits since font objects can not be
+        used once the font module has been shut down.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.maxtexts = maxtexts
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.font_hits = 0
+        self.font_misses = 0
+        self.text_hits = 0
+        self.text_misses = 0
+
+    def font(self, size, file=None):
+        """Return the font object for the given size and font file. A file of
+        None gives the default pygame font."""
+        key = (file, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.font_hits += 1
+            return font
+        self.font_misses += 1
+
+        # The font module only needs to be initialized the first time a font
+        # is made
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = self.fonts[key] = pygame.font.Font(file, size)
+        return font
+
+    def render(self, text, size, color=(1, 1, 1), antialias=0, file=None):
+        """Return a surface of the rendered text, rendering it only if the same
+        text, font and color have not been rendered recently."""
+        key = (text, file, size, tuple(color), bool(antialias))
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            self.text_hits += 1
+            return surface
+        self.text_misses += 1
+
+        surface = self.font(size, file).render(text, antialias, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.maxtexts:
+            self.texts.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Empty the cache and reset the counters."""
+        self.fonts.clear()
+        self.texts.clear()
+        self.font_hits = 0
+        self.font_misses = 0
+        self.text_hits = 0
+        self.text_misses = 0
+
+    def quit(self):
+        """Drop the fonts and texts, keeping the counters. This is called by
+        pygame.quit and registers itself again for the next quit."""
+        self.fonts.clear()
+        self.texts.clear()
+        pygame.register_quit(self.quit)
+
+    def stats(self):
+        """Return a dictionary of the cache counters."""
+        return {'font_hits': self.font_hits, 'font_misses': self.font_misses,
+                'text_hits': self.text_hits, 'text_misses': self.text_misses,
+                'fonts': len(self.fonts), 'texts': len(self.texts)}
+
+
+class Atlas:
+    def __init__(self, file, grid=None, regions=None, mode='convert'):
+        """This class loads a sprite sheet (texture atlas) once and hands out
+        named regions of it. A region can be passed to Tile, wTile or a
+        picture Button in place of a file name.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            file - This is a string of the picture file name of the sheet.
+
+            grid - If a (width, height) tuple is passed the sheet is cut into
+                cells of that size, named by their (column, row) tuple.
+
+            regions - This is a dictionary of extra regions keyed by name, with
+                each value a pygame rect or (x, y, width, height) tuple.
+
+            mode - This is the mode the sheet is loaded with. See
+                Assetcache.load.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            sheet - The surface of the whole sheet.
+
+            rects - A dictionary of the rect of every region keyed by name.
+
+        Regions are subsurfaces that share the pixels of the sheet, so they
+        cost no memory. Regions scaled to another size are made once per size
+        and kept in the asset cache.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.file = file
+        self.mode = mode
+        self.sheet = load_image(file, None, mode)
+        self.rects = {}
+        self.regions = {}
+
+        if grid is not None:
+            width, height = self.sheet.get_size()
+            for column in range(width // grid[0]):
+                for row in range(height // grid[1]):
+                    self.rects[(column, row)] = pygame.Rect(
+                        column * grid[0], row * grid[1], grid[0], grid[1])
+        if regions is not None:
+            for name, rect in regions.items():
+                self.rects[name] = pygame.Rect(rect)
+
+    def __getitem__(self, name):
+        """Return the region with the given name."""
+        region = self.regions.get(name)
+        if region is None:
+            if name not in self.rects:
+                raise KeyError(name)
+            region = self.regions[name] = Atlasregion(self, name)
+        return region
+
+    def names(self):
+        """Return a list of the names of the regions."""
+        return list(self.rects)
+
+    def image(self, name, size=None):
+        """Return the surface of a region, scaled to size if one is given."""
+        return load_image(self[name], size, self.mode)
+
+
+class Atlasregion:
+    def __init__(self, atlas, name):
+        """A named region of an Atlas. It can be used anywhere an image file
+        name is accepted.
+
+        (doc string updated ver 0.2)
+        """
+        self.atlas = atlas
+        self.name = name
+        self.surface = atlas.sheet.subsurface(atlas.rects[name])
+        # The rect is part of the key since atlases of the same sheet can cut
+        # it differently under the same name
+        self.key = (atlas.file, atlas.mode, name, tuple(atlas.rects[name]))
+
+    def __eq__(self, other):
+        return isinstance(other, Atlasregion) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return 'Atlasregion(%r, %r)' % (self.atlas.file, self.name)
+
+
+class Preloader:
+    def __init__(self, workers=2):
+        """This class decodes image, sound and font files on a pool of
+        background threads so they are ready before the screen that needs them
+        is made. Only the conversion to the display format, which has to happen
+        on the main thread, is left for finish.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            workers - This is the number of background threads. The default
+                is 2.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            jobs - A dictionary of the loads that have not been finished,
+                keyed the same way as the cache they go into.
+
+            total - The number of loads added since the preloader was last
+                empty, used by progress.
+
+        Assets are described with a dictionary such as
+            {'images': ['back.png', ('button.png', (100, 50))],
+             'sounds': ['click.wav'],
+             'fonts': [36, (24, 'title.ttf')]}
+        where an image is a file or a (file, size) or (file, size, mode) tuple
+        the same as the inputs of load_image, and a font is a size or a
+        (size, file) tuple the same as the inputs of get_font. Music is
+        streamed from the disk as it plays so it is not preloaded.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.executor = ThreadPoolExecutor(workers)
+        self.jobs = OrderedDict()
+        self.total = 0
+
+    def add(self, assets):
+        """This method starts loading the assets in the background. Assets
+        that are already cached or already being loaded are skipped.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            assets - This is a dictionary of the assets to load. See the class
+                doc string for its layout.
+
+        (doc string updated ver 0.2)
+        """
+
+        for key in self.keys(assets):
+            if key in self.jobs or self.cached(key):
+                continue
+            if key[0] == 'image':
+                job = self.executor.submit(self.decode_image, key[1], key[2])
+            elif key[0] == 'sound':
+                job = self.executor.submit(pygame.mixer.Sound, key[1])
+            else:
+                job = self.executor.submit(pygame.font.Font, key[1], key[2])
+            self.jobs[key] = job
+            self.total += 1
+
+    def keys(self, assets):
+        # Turn an assets dictionary into a list of job keys
+        keys = []
+        for i in assets.get('images', []):
+            if not isinstance(i, tuple):
+                i = (i,)
+            file = i[0]
+            size = i[1] if len(i) > 1 else None
+            mode = i[2] if len(i) > 2 else 'convert'
+            if size is not None:
+                size = (int(size[0]), int(size[1]))
+            keys.append(('image', file, size, mode))
+        if pygame.mixer.get_init():
+            for i in assets.get('sounds', []):
+                keys.append(('sound', i))
+        if assets.get('fonts'):
+            if not pygame.font.get_init():
+                pygame.font.init()
+            for i in assets['fonts']:
+                if not isinstance(i, tuple):
+                    i = (i, None)
+                keys.append(('font', i[1], i[0]))
+        return keys
+
+    @staticmethod
+    def cached(key):
+        if key[0] == 'image':
+            return key[1:] in assetcache.surfaces
+        elif key[0] == 'sound':
+            return key[1] in soundcache
+        return key[1:] in fontcache.fonts
+
+    @staticmethod
+    def decode_image(file, size):
+        # Runs on a worker thread, so the surface is not converted here
+        surface = pygame.image.load(file)
+        if size is not None and surface.get_size() != size:
+            surface = pygame.transform.scale(surface, size)
+        return surface
+
+    def progress(self):
+        """Return the fraction (0 to 1) of the added assets that have been
+        loaded, for drawing a loading bar."""
+        if not self.total:
+            return 1.0
+        waiting = sum(1 for job in self.jobs.values() if not job.done())
+        return (self.total - waiting) / self.total
+
+    def done(self):
+        """Return True if every added asset has been loaded."""
+        return all(job.done() for job in self.jobs.values())
+
+    def finish(self, assets=None, wait=True):
+        """This method moves loaded assets into the shared caches, converting
+        images to the display format. It must be called from the main thread.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            assets - If an assets dictionary is passed only those assets are
+                finished, otherwise every added asset is.
+
+            wait - If True wait for assets that are still loading. If False
+                only the assets that are already loaded are finished.
+
+        Errors from loading a file are raised here. The number of assets moved
+        into the caches is returned.
+
+        (doc string updated ver 0.2)
+        """
+
+        keys = list(self.jobs) if assets is None else [
+            i for i in self.keys(assets) if i in self.jobs]
+        finished = 0
+        for key in keys:
+            job = self.jobs[key]
+            if not wait and not job.done():
+                continue
+            del self.jobs[key]
+            result = job.result()
+            if key[0] == 'image':
+                if key[3] is not None:
+                    result = display_format(result, key[3] == 'alpha')
+                assetcache.store(key[1:], result)
+            elif key[0] == 'sound':
+                soundcache[key[1]] = result
+            else:
+                fontcache.fonts[key[1:]] = result
+            finished += 1
+        if not self.jobs:
+            self.total = 0
+        return finished
+
+    def cancel(self):
+        """Forget every asset that has not been finished. Loads that have
+        already started run to the end and are thrown away."""
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs.clear()
+        self.total = 0
+
+    def close(self):
+        """Cancel the waiting loads and stop the background threads."""
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+
+# The caches shared by every class in the toolbox
+assetcache = Assetcache()
+fontcache = Fontcache()
+pygame.register_quit(fontcache.quit)
+soundcache = {}
+
+# The number of surfaces made by new_surface, read by the frame profiler
+created = 0
+
+
+def load_image(file, size=None, mode='convert'):
+    """Load an image through the shared asset cache. See Assetcache.load for
+    the inputs."""
+    return assetcache.load(file, size, mode)
+
+
+def load_sound(file):
+    """Return the shared pygame Sound for a sound file, loading it the first
+    time it is asked for."""
+    sound = soundcache.get(file)
+    if sound is None:
+        sound = soundcache[file] = pygame.mixer.Sound(file)
+    return sound
+
+
+def display_format(surface, alpha=False):
+    """Convert a surface to the pixel format of the display (with per pixel
+    alpha if alpha is True) so it blits without conversion. The surface is
+    returned unchanged if no display mode has been set yet."""
+    if pygame.display.get_surface() is None:
+        return surface
+    if alpha:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+def new_surface(size, alpha=False):
+    """Make a new surface of the given size, with per pixel alpha if alpha
+    is True. Once a display mode is set new surfaces already match the
+    display, so only images loaded from files need converting."""
+    global created
+    created += 1
+    if alpha:
+        return pygame.Surface(size, pygame.SRCALPHA)
+    return pygame.Surface(size)
+
+
+def get_font(size, file=None):
+    """Return a shared font object. See Fontcache.font for the inputs."""
+    return fontcache.font(size, file)
+
+
+def render_text(text, size, color=(1, 1, 1), antialias=0, file=None):
+    """Render text through the shared text cache. See Fontcache.render for the
+    inputs."""
+    return fontcache.render(text, size, color, antialias, file)
@@ -0,0 +1,69 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.graphics.hittest.py
+# Purpose:     This module holds the grid used by the screens to find which
+#              button or widget is under the mouse
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Hitgrid
+#   moved
+#   generation
+
+import pygame
+
+# This counter goes up every time a button is positioned. Screens compare it
+# with the value they built their grids at to know when to rebuild them.
+generation = 0
+
+
+def moved():
+    """Report that a button or widget changed position."""
+    global generation
+    generation += 1
+
+
+class Hitgrid:
+    def __init__(self, items, cellsize=64):
+        """This class buckets the rectangles of a list of buttons or widgets
+        into a uniform grid so the item under a point can be found by looking
+        at a single cell instead of testing every item.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            items - This is a list of objects with pos and image attributes
+                (buttons, tiles and widgets). Items later in the list are
+                treated as drawn on top of earlier ones.
+
+            cellsize - This is the width and height of a grid cell in pixels.
+                The default is 64.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.cellsize = cellsize
+        self.cells = {}
+        for order, i in enumerate(items):
+            rect = pygame.Rect(i.pos, i.image.get_size())
+            for x in range(rect.left // cellsize,
+                           (rect.right - 1) // cellsize + 1):
+                for y in range(rect.top // cellsize,
+                               (rect.bottom - 1) // cellsize + 1):
+                    self.cells.setdefault((x, y), []).append((order, rect, i))
+
+    def query(self, pos):
+        """Return the topmost item whose rectangle contains pos, or None."""
+        cell = self.cells.get((pos[0] // self.cellsize,
+                               pos[1] // self.cellsize))
+        if cell:
+            for order, rect, i in reversed(cell):
+                if rect.collidepoint(pos):
+                    return i
+        return None
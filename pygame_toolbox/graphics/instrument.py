@@ -0,0 +1,215 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.graphics.instrument.py
+# Purpose:     This module measures where the time of each frame of the update
+#              loops goes so slow frames can be found and tracked
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Frameprofiler
+#   enable
+#   disable
+
+from . import BaseScreen
+from .assets import assetcache, fontcache, get_font
+from . import assets
+from collections import deque
+from time import perf_counter
+import csv
+import json
+import pygame
+
+
+class Frameprofiler:
+    # The timed parts of a frame and the counted things, in report order
+    sections = ('wait', 'handle', 'hit', 'draw', 'blit', 'flip')
+    counters = ('events', 'blits', 'surfaces')
+
+    def __init__(self, window=300, overlay=False):
+        """This class records how long each part of every frame takes in the
+        update loops of Menu, Textscreens and Tilemap, along with how many
+        events, blits and new surfaces each frame had.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            window - This is the number of recent frames kept for percentiles
+                and exports. The default is 300.
+
+            overlay - If True the frame time percentiles are drawn in the top
+                left corner of the display every frame.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            frames - The recent frames, oldest first. Each frame is a
+                dictionary of the total frame time and section times in
+                milliseconds and the counts for that frame.
+
+        The sections are
+            wait - waiting for the frame and reading the event queue
+            handle - handling the events and any other work of the update loop
+            hit - finding the button or tile under the mouse
+            draw - drawing changed tiles onto the screen image
+            blit - blitting the screen image to the display
+            flip - sending the display to the monitor
+
+        The profiler does nothing until it is turned on with enable, and a
+        screen without a profiler only pays for a check against None.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.window = window
+        self.overlay = overlay
+        self.frames = deque(maxlen=window)
+        self.current = None
+        self.started = {}
+        self.overlayrect = None
+        self.made = self.surfaces_made()
+
+    @staticmethod
+    def surfaces_made():
+        # New screen surfaces, decoded or scaled images and rendered text
+        return assets.created + assetcache.misses + fontcache.text_misses
+
+    def begin_frame(self):
+        """End the frame that is running and start the next one. Called by
+        BaseScreen.get_events."""
+        now = perf_counter()
+        if self.current is not None:
+            self.end_frame(now)
+        self.current = dict.fromkeys(self.sections, 0.0)
+        self.current.update(dict.fromkeys(self.counters, 0))
+        self.current['start'] = now
+        self.started = {'wait': now}
+
+    def end_frame(self, now):
+        frame = self.current
+        frame['frame'] = (now - frame.pop('start')) * 1000
+        made = self.surfaces_made()
+        frame['surfaces'] = made - self.made
+        self.made = made
+
+        # Whatever was not timed was spent handling events
+        for name in self.sections:
+            frame[name] *= 1000
+        frame['handle'] = max(0.0, frame['frame'] - sum(
+            frame[name] for name in self.sections if name != 'handle'))
+        self.frames.append(frame)
+
+    def start(self, name):
+        """Start timing a section of the current frame."""
+        self.started[name] = perf_counter()
+
+    def stop(self, name):
+        """Stop timing a section, adding the time to the current frame."""
+        if self.current is not None:
+            self.current[name] += perf_counter() - self.started.pop(name)
+
+    def count(self, name, n=1):
+        """Add n to a counter of the current frame."""
+        if self.current is not None:
+            self.current[name] += n
+
+    def values(self, name):
+        """Return the list of the recorded values of a section, counter or
+        'frame' for the total frame time."""
+        return [frame[name] for frame in self.frames]
+
+    def percentile(self, name, p):
+        """Return the p-th percentile (0 to 100) of a section, counter or
+        'frame' over the recent frames, or None if no frame was recorded."""
+        values = sorted(self.values(name))
+        if not values:
+            return None
+        index = int(round(p / 100 * (len(values) - 1)))
+        return values[min(len(values) - 1, max(0, index))]
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """This method returns a dictionary keyed by 'frame', section and
+        counter name of dictionaries holding the mean, maximum and requested
+        percentiles (keyed 'p50' and so on) over the recent frames.
+
+        (doc string updated ver 0.2)
+        """
+
+        summary = {}
+        if not self.frames:
+            return summary
+        for name in ('frame',) + self.sections + self.counters:
+            values = self.values(name)
+            stats = {'mean': sum(values) / len(values), 'max': max(values)}
+            for p in percentiles:
+                stats['p%g' % p] = self.percentile(name, p)
+            summary[name] = stats
+        return summary
+
+    def export_csv(self, file):
+        """Write the recent frames to a CSV file with one row per frame."""
+        names = ('frame',) + self.sections + self.counters
+        with open(file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            for frame in self.frames:
+                writer.writerow([frame[name] for name in names])
+
+    def export_json(self, file):
+        """Write the summary and the recent frames to a JSON file."""
+        with open(file, 'w') as f:
+            json.dump({'summary': self.summary(), 'frames': list(self.frames)},
+                      f, indent=1)
+
+    def reset(self):
+        """Forget the recorded frames."""
+        self.frames.clear()
+        self.current = None
+
+    def draw_overlay(self, screen):
+        """This method draws the frame time percentiles onto the display and
+        returns the rect that was drawn over. The text is rendered directly
+        and not through the text cache since it changes every frame.
+
+        (doc string updated ver 0.2)
+        """
+
+        if not self.frames:
+            return None
+        font = get_font(18)
+        lines = ['%-6s p50 %5.1f  p99 %5.1f ms' % (
+            name, self.percentile(name, 50), self.percentile(name, 99))
+            for name in ('frame',) + self.sections]
+        images = [font.render(i, 0, (255, 255, 255), (0, 0, 0))
+                  for i in lines]
+        rect = pygame.Rect(0, 0, max(i.get_width() for i in images),
+                           sum(i.get_height() for i in images))
+        y = 0
+        for i in images:
+            screen.blit(i, (0, y))
+            y += i.get_height()
+        self.overlayrect = rect
+        return rect
+
+
+def enable(screen=None, window=300, overlay=False):
+    """Turn on the frame profiler for one screen or, if no screen is given,
+    for every screen. The profiler is returned."""
+    profiler = Frameprofiler(window, overlay)
+    if screen is None:
+        BaseScreen.profiler = profiler
+    else:
+        screen.profiler = profiler
+    return profiler
+
+
+def disable(screen=None):
+    """Turn the frame profiler off for one screen or for every screen."""
+    if screen is None:
+        BaseScreen.profiler = None
+    else:
+        screen.profiler = None
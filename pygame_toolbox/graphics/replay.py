@@ -0,0 +1,289 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.graphics.replay.py
+# Purpose:     This module records the events of a session played through the
+#              update loops and plays them back as fast as possible
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Replayfinished
+#   Virtualclock
+#   Recorder
+#   read_lines
+#   Player
+
+# File layout: a gzip compressed text file of JSON values, one per line.
+#   The first line is a header dictionary holding the format version and
+#   the pygame version the session was recorded with.
+#   Every other line is one frame. A frame without events is the number of
+#   milliseconds the frame took and a frame with events is a list of the
+#   milliseconds followed by one [type, attributes] list per event.
+
+from . import BaseScreen
+import gzip
+import io
+import json
+import pygame
+import zlib
+
+VERSION = 1
+
+
+class Replayfinished(Exception):
+    """Raised by a Player when the recording runs out or reaches the point
+    where the window was closed."""
+    pass
+
+
+class Virtualclock:
+    def __init__(self):
+        """This class stands in for pygame.time.Clock during a replay. Time
+        only moves forward by the frame times of the recording so a replay
+        runs as fast as possible but sees the same frame times as the session
+        that was recorded.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            ticks - The virtual number of milliseconds since the replay
+                started.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.ticks = 0
+        self.time = 0
+        self.times = []
+
+    def advance(self, milliseconds):
+        """Move the virtual time forward by one frame."""
+        self.time = milliseconds
+        self.ticks += milliseconds
+        self.times.append(milliseconds)
+        if len(self.times) > 10:
+            del self.times[0]
+
+    def tick(self, framerate=0):
+        """Return the time of the last frame without waiting."""
+        return self.time
+
+    def get_time(self):
+        return self.time
+
+    def get_rawtime(self):
+        return self.time
+
+    def get_ticks(self):
+        return self.ticks
+
+    def get_fps(self):
+        total = sum(self.times)
+        if not total:
+            return 0.0
+        return 1000.0 * len(self.times) / total
+
+
+def encode(event):
+    # Keep the attributes that can be written as JSON, such as pos, button,
+    # key and unicode
+    attributes = {}
+    for name, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            attributes[name] = value
+        elif isinstance(value, tuple) and all(
+                isinstance(i, (int, float)) for i in value):
+            attributes[name] = value
+    return [event.type, attributes]
+
+
+def decode(item):
+    # pygame events have no list attributes, so lists were tuples
+    attributes = dict((name, tuple(value) if isinstance(value, list) else
+                       value) for name, value in item[1].items())
+    return pygame.event.Event(item[0], attributes)
+
+
+class Recorder:
+    def __init__(self, file, flush_every=30):
+        """This class records every frame of events read by the update loops
+        of the toolbox screens, along with how long each frame took, to a
+        compact file that a Player can replay.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            file - This is the file name to write the recording to.
+
+            flush_every - This is the number of frames between flushes of the
+                compressed stream to the file. The default is 30.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            frames - The number of frames recorded.
+
+        Call install before running the game and close afterwards. Events are
+        read from the pygame queue as normal, so the game plays the same way
+        while it is being recorded. Every flush_every frames the compressed
+        stream is flushed to a point it can be read back from, so a session
+        that crashes is still recorded up to the last flush before the crash.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.gzip = gzip.GzipFile(file, 'wb')
+        self.file = io.TextIOWrapper(self.gzip, encoding='utf-8')
+        self.file.write(json.dumps({'version': VERSION,
+                                    'pygame': pygame.version.ver}) + '\n')
+        self.flush_every = flush_every
+        self.frames = 0
+        self.flush()
+
+    def flush(self):
+        """Write everything recorded so far to the file so that it can be
+        read even if the file is never closed."""
+        self.file.flush()
+        self.gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def install(self):
+        """Start recording the frames of every screen."""
+        BaseScreen.eventsource = self
+
+    def get_events(self, screen, clock):
+        events = screen.wait_events(clock)
+        if events:
+            frame = [clock.get_time()] + [encode(i) for i in events]
+        else:
+            frame = clock.get_time()
+        self.file.write(json.dumps(frame, separators=(',', ':')) + '\n')
+        self.frames += 1
+        if self.frames % self.flush_every == 0:
+            self.flush()
+        return events
+
+    def close(self):
+        """Stop recording and close the file."""
+        if BaseScreen.eventsource is self:
+            BaseScreen.eventsource = None
+        self.file.close()
+
+
+def read_lines(file):
+    # Return the complete lines of a recording. A recording that was never
+    # closed ends without the gzip end marker and may end part way through a
+    # line, so the lines before that point are kept and the rest is dropped.
+    lines = []
+    with gzip.open(file, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                lines.append(line)
+        except EOFError:
+            pass
+    if lines and not lines[-1].endswith('\n'):
+        del lines[-1]
+    return lines
+
+
+class Player:
+    def __init__(self, file):
+        """This class feeds a recording made by a Recorder back through the
+        update loops of the toolbox screens, one recorded frame per frame,
+        without waiting between frames.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            file - This is the file name of the recording.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            clock - The Virtualclock that follows the recorded frame times.
+                Pass it to the update loops (run does this for an event
+                handler) so code that reads the clock sees recorded times.
+
+            frame - The number of frames played so far.
+
+        When the recording runs out, or reaches a QUIT event, Replayfinished
+        is raised from the update loop that asked for the next frame. The
+        real event queue is emptied every frame so events posted by the game
+        itself, which are part of the recording, are not seen twice.
+
+        A recording that was not closed, such as one from a session that
+        crashed, is played up to its last complete frame.
+
+        (doc string updated ver 0.2)
+        """
+
+        lines = read_lines(file)
+        try:
+            self.header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            self.header = {}
+        if not isinstance(self.header, dict) or \
+                self.header.get('version') != VERSION:
+            raise ValueError('%s is not a recording' % file)
+        self.frames = [json.loads(line) for line in lines[1:]]
+        self.clock = Virtualclock()
+        self.frame = 0
+
+    def install(self):
+        """Start replaying into every screen."""
+        BaseScreen.eventsource = self
+
+    def uninstall(self):
+        """Go back to reading the pygame event queue."""
+        if BaseScreen.eventsource is self:
+            BaseScreen.eventsource = None
+
+    def rewind(self):
+        """Start the recording again from the first frame."""
+        self.clock = Virtualclock()
+        self.frame = 0
+
+    def get_events(self, screen, clock):
+        if self.frame >= len(self.frames):
+            raise Replayfinished('The recording ended after %d frames' %
+                                 self.frame)
+        frame = self.frames[self.frame]
+        self.frame += 1
+        pygame.event.clear()
+
+        if not isinstance(frame, list):
+            frame = [frame]
+        self.clock.advance(frame[0])
+        if clock is not self.clock and isinstance(clock, Virtualclock):
+            clock.advance(frame[0])
+
+        events = [decode(i) for i in frame[1:]]
+        for event in events:
+            if event.type == pygame.QUIT:
+                raise Replayfinished('The window was closed after %d frames'
+                                     % self.frame)
+        return events
+
+    def run(self, target):
+        """This method replays the recording from the start into a game and
+        returns the number of frames played.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            target - This is an Eventhandler (or Scenemanager), whose clock is
+                replaced by the virtual clock before its update method runs,
+                or any function that runs the game.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.rewind()
+        self.install()
+        try:
+            if hasattr(target, 'update') and hasattr(target, 'clock'):
+                target.clock = self.clock
+                target.update()
+            else:
+                target()
+        except Replayfinished:
+            pass
+        finally:
+            self.uninstall()
+        return self.frame
@@ -0,0 +1,194 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.graphics.scenes.py
+# Purpose:     This module holds a scene manager built on the event handler
+#              that keeps screens alive between visits and stacks overlays
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Scene
+#   Push
+#   Pop
+#   Scenemanager
+
+from . import Eventhandler
+from .assets import Preloader
+
+
+class Scene:
+    def __init__(self, factory, persistent=True, assets=None, preload=()):
+        """This class describes one screen of a game for the scene manager.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            factory - This is a class or function that makes the screen, such
+                as a Menu, Tilemap or Textscreens subclass. The screen's update
+                method is called with the display and clock and should return
+                the next progress value.
+
+            persistent - If True the screen is made once and kept alive so
+                returning to the scene does not rebuild it. If False a new
+                screen is made every visit. The default is True.
+
+            assets - This is a dictionary of the image, sound and font files
+                the screen loads, laid out as described by the Preloader class
+                of the assets module. The scene manager loads them in the
+                background before the scene is shown.
+
+            preload - This is a list of the progress values of the scenes that
+                can follow this one. Their assets start loading in the
+                background as soon as this scene is shown.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            instance - The screen made by the factory, or None if it has not
+                been made or is not kept.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.factory = factory
+        self.persistent = persistent
+        self.assets = assets
+        self.preload = preload
+        self.instance = None
+
+    def get(self):
+        """Return the screen for this scene, making it if needed."""
+        if self.instance is None:
+            self.instance = self.factory()
+        return self.instance
+
+    def run(self, screen, clock):
+        """Show the scene and return what its update method returned."""
+        return self.get().update(screen, clock)
+
+    def release(self):
+        """Forget the kept screen so it is rebuilt on the next visit."""
+        self.instance = None
+
+
+class Push:
+    def __init__(self, progress):
+        """Returned from a screen to show the scene for progress on top of the
+        current scene. The current scene is kept alive and shown again when
+        the overlay returns Pop."""
+        self.progress = progress
+
+
+class Pop:
+    def __init__(self, value=None):
+        """Returned from an overlay scene to go back to the scene under it.
+        The value is stored on the manager as popped_value."""
+        self.value = value
+
+
+class Scenemanager(Eventhandler):
+    def __init__(self, scenes, screen, progress=1):
+        """The scene manager takes care of which scene to display, like the
+        event handler, but looks scenes up in a dictionary, can keep their
+        screens alive between visits and can stack overlay scenes.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            scenes - This is a dictionary keyed by progress value. Each value
+                is a Scene or, as with the event handler, a function that is
+                called with the display and clock. A list of [progress, item]
+                pairs like the event handler takes is also accepted.
+
+            screen - This is the pygame display to show the scenes on.
+
+            progress - This is the progress value of the first scene. The
+                default is 1.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            stack - The progress values of the scenes covered by overlays.
+
+            popped_value - The value of the last Pop returned by an overlay.
+
+            preloader - The Preloader that loads the assets of the scenes that
+                come next. A loading scene can draw preloader.progress().
+
+        A scene returns the next progress value to switch scenes, Push(n) to
+        show scene n on top of itself, or Pop() to return to the scene it
+        covers.
+
+        (doc string updated ver 0.2)
+        """
+
+        if not isinstance(scenes, dict):
+            scenes = dict((i[0], i[1]) for i in reversed(scenes))
+        Eventhandler.__init__(self, [], screen)
+        self.scenes = scenes
+        self.progress = progress
+        self.stack = []
+        self.popped_value = None
+        self.preloader = Preloader()
+
+    def dispatch(self, progress):
+        try:
+            return self.scenes[progress]
+        except KeyError:
+            raise KeyError('No scene was given for progress %r' % (progress,))
+
+    def preload(self, progress):
+        """Start loading the assets of the scene for progress in the
+        background."""
+        scene = self.scenes.get(progress)
+        if isinstance(scene, Scene) and scene.assets:
+            self.preloader.add(scene.assets)
+
+    def push(self, progress):
+        """Return the Push for progress, for use in button functions."""
+        return Push(progress)
+
+    def pop(self, value=None):
+        """Return a Pop, for use in button functions."""
+        return Pop(value)
+
+    def step(self):
+        """This method shows the current scene once and moves to the scene it
+        asks for.
+
+        (doc string updated ver 0.2)
+        """
+
+        scene = self.dispatch(self.progress)
+        if isinstance(scene, Scene):
+            # Convert what the preloader has decoded for this scene and start
+            # on the scenes that can follow it
+            if scene.assets and scene.instance is None:
+                self.preloader.add(scene.assets)
+                self.preloader.finish(scene.assets)
+            for i in scene.preload:
+                self.preload(i)
+            result = scene.run(self.screen, self.clock)
+        else:
+            result = scene(self.screen, self.clock)
+
+        if isinstance(result, Push):
+            self.stack.append(self.progress)
+            self.progress = result.progress
+            return
+
+        # The scene is done with, so let it go unless it is kept
+        if isinstance(scene, Scene) and not scene.persistent:
+            scene.release()
+        if isinstance(result, Pop):
+            if not self.stack:
+                raise IndexError('Pop was returned with no scene to go back to')
+            self.popped_value = result.value
+            self.progress = self.stack.pop()
+        else:
+            self.progress = result
+
+    def update(self):
+        while True:
+            self.step()
@@ -13,12 +13,57 @@
 
 # Module Contents
 #   wButton
+#   wTile
 #   Checkbox
+#   CheckboxGroup
+#   Scrolllist
+#   Lazyitems
+#   checkbox_images
 
 from .. import graphics as ptg
 from .. import tilegame_tools as pttt
+from .assets import get_font, new_surface, render_text
 import pygame
 
+# The unchecked and checked images of each (size, checktype) of checkbox
+checkimages = {}
+
+
+def checkbox_images(size, checktype='r'):
+    """Return the shared (unchecked, checked) pair of checkbox images for a
+    size and checktype, drawing them the first time they are asked for."""
+    key = (tuple(size), checktype)
+    images = checkimages.get(key)
+    if images is None:
+        unchecked = new_surface(size)
+        unchecked.fill((255, 255, 255))
+        checked = unchecked.copy()
+        if checktype == 'r':
+            draw_rect_check(checked)
+        elif checktype == 'c':
+            draw_circle_check(checked)
+        images = checkimages[key] = (unchecked, checked)
+    return images
+
+
+def draw_rect_check(image):
+    # Draw a black check that is 75% of the size of the whole box in the
+    # middle of the box
+    imagesize = image.get_size()
+    imagemidp = (int(imagesize[0] * 0.5), int(imagesize[1] * 0.5))
+    checkmidp = (int(imagesize[0] * 0.375), int(imagesize[1] * 0.375))
+    image.fill((0, 0, 0), (imagemidp[0] - checkmidp[0],
+                           imagemidp[1] - checkmidp[1],
+                           round(0.75 * imagesize[0]),
+                           round(0.75 * imagesize[1])))
+
+
+def draw_circle_check(image):
+    # Draw a black check circle that is 75% of the size of the whole box
+    imagesize = image.get_size()
+    imagemidp = (int(imagesize[0] * 0.5), int(imagesize[1] * 0.5))
+    pygame.draw.circle(image, (0, 0, 0), imagemidp, int(imagesize[0]*0.375))
+
 
 # Variant on the button class that allows inputs to its call
 
@@ -75,7 +120,10 @@ class wTile(pttt.Tile):
 # on menu exit
 
 
-class Checkbox:
+class Checkbox(pygame.sprite.DirtySprite):
+    # The position of the screen the checkbox is on, set by set_offset
+    offset = (0, 0)
+
     def __init__(self, name, position, size, midpoint=False, surface=None,
                  checktype='r'):
         """This class will give the user an easy way to make decisions
@@ -100,16 +148,24 @@ class Checkbox:
                 of the box will look like. 'r' is a rectangular check and 'c'
                 is a circular check
 
-        (doc string updated ver 0.1)
+        The checked and unchecked images are drawn once for each size and
+        checktype and shared by every checkbox, so clicking a checkbox only
+        swaps its image.
+
+        (doc string updated ver 0.2)
         """
+        # Initialize the sprite class
+        pygame.sprite.DirtySprite.__init__(self)
+
         # Set the name, status and checktype of the checkbox widget
         self.name = name
         self.status = 0
         self.checktype = checktype
+        self.dirty = 0
 
-        # Create the surface that will hold the checkbox image
-        self.image = pygame.Surface((size))
-        self.image.fill((255, 255, 255))
+        # Use the shared unchecked image
+        self.images = checkbox_images(size, checktype)
+        self.image = self.images[0]
 
         # Keep location information
         self.position = position
@@ -117,46 +173,450 @@ class Checkbox:
         self.surface = surface
         ptg.Button.set_position(self, position, midpoint, surface)
 
+    def __call__(self, *arg):
+        # Swap to the other image and draw it on the external surface. The
+        # checkbox has not moved so set_position is not needed.
+        self.status = 0 if self.status else 1
+        self.image = self.images[self.status]
+        self.blitinfo = (self.image, self.pos)
+        if self.surface:
+            self.surface.blit(*self.blitinfo)
+        self.dirty = 1
+
     def draw_rect_check(self):
-        # Create a black check that is 75% of the size of the whole box
-        imagesize = self.image.get_size()
-        imagemidp = (int(imagesize[0] * 0.5), int(imagesize[1] * 0.5))
-        check = pygame.Surface((round(0.75*imagesize[0]),
-                                round(0.75*imagesize[1])))
-        check.fill((0, 0, 0))
-
-        # Put the check in the middle of the checkbox
-        checkmidp = (int(imagesize[0] * 0.375), int(imagesize[1] * 0.375))
-        self.image.blit(check, (imagemidp[0]-checkmidp[0],
-                                imagemidp[1]-checkmidp[1]))
+        # Draw a rectangular check on the checkbox's own copy of its image so
+        # the shared images are left alone
+        self.image = self.image.copy()
+        draw_rect_check(self.image)
 
     def draw_circle_check(self):
-        # Create a black check circle that is 75% of the size of
-        # the whole box
-        imagesize = self.image.get_size()
-        imagemidp = (int(imagesize[0] * 0.5), int(imagesize[1] * 0.5))
-        pygame.draw.circle(self.image, (0, 0, 0), imagemidp,
-                           int(imagesize[0]*0.375))
+        # Draw a circular check on the checkbox's own copy of its image
+        self.image = self.image.copy()
+        draw_circle_check(self.image)
 
-    def __call__(self, *arg):
-        if self.status:
-            # If the checkbox was previously checked, set the status
-            # to 0 and turn the whole box back to white.
-            self.status = 0
-            self.image.fill((255, 255, 255))
-
-            # Draw the checkbox on the external surface
-            ptg.Button.set_position(self, self.position, self.midpoint,
-                                    self.surface)
+
+class CheckboxGroup(pygame.sprite.DirtySprite):
+    # The position of the screen the group is on, set by set_offset
+    offset = (0, 0)
+
+    def __init__(self, name, labels, position, size, midpoint=False,
+                 surface=None, checktype='r', columns=1, fontsize=24,
+                 spacing=8):
+        """This widget draws an organized list of labelled checkboxes as one
+        widget and keeps their states packed in a bitset, one bit per box.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            name - This is the name the menu's widget_status will pass for the
+                group.
+
+            labels - This is a list of the text to draw next to each box. An
+                empty string leaves a box without a label.
+
+            position - This is the (x,y) position of the group in pixels.
+
+            size - A width, height tuple of the size of each box in pixels.
+
+            midpoint - If true the position input will be treated as the
+                middle of the group instead of the top left corner.
+
+            surface - This is the surface that the group will be drawn on.
+
+            checktype - 'r' for rectangular checks or 'c' for circular checks.
+
+            columns - This is the number of columns the boxes are laid out
+                in, filling each row from left to right. The default is 1.
+
+            fontsize - This is the size of the label text. The default is 24.
+
+            spacing - This is the number of pixels between boxes and between
+                a box and its label. The default is 8.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            status - The states of every box as one integer, with bit i set
+                when box i is checked. This is what widget_status returns for
+                the group.
+
+            bits - The bytearray the states are kept in.
+
+        Clicking the group finds the box under the menu's mouse_event and
+        only redraws that box.
+
+        (doc string updated ver 0.2)
+        """
+
+        # Initialize the sprite class
+        pygame.sprite.DirtySprite.__init__(self)
+        self.dirty = 0
+
+        self.name = name
+        self.labels = list(labels)
+        self.bits = bytearray((len(self.labels) + 7) // 8)
+        self.images = checkbox_images(size, checktype)
+        self.boxsize = tuple(size)
+        self.columns = columns
+
+        # Size each cell to fit the box and the widest label
+        texts = [render_text(i, fontsize) if i else None for i in self.labels]
+        labelwidth = max([i.get_width() for i in texts if i is not None] +
+                         [0])
+        labelheight = max([i.get_height() for i in texts if i is not None] +
+                          [0])
+        self.cellsize = (size[0] + (spacing + labelwidth if labelwidth else 0)
+                         + spacing, max(size[1], labelheight) + spacing)
+        rows = -(-len(self.labels) // columns)
+        self.image = new_surface((self.cellsize[0] * columns,
+                                  self.cellsize[1] * rows), True)
+
+        # Draw every box unchecked along with its label
+        blits = []
+        for n, text in enumerate(texts):
+            box = self.box_rect(n)
+            blits.append((self.images[0], box))
+            if text is not None:
+                blits.append((text, (box.right + spacing, box.centery -
+                                     text.get_height() // 2)))
+        self.image.blits(blits, False)
+
+        # Keep location information
+        self.position = position
+        self.midpoint = midpoint
+        self.surface = surface
+        ptg.Button.set_position(self, position, midpoint, surface)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def box_rect(self, n):
+        """Return the rect of box n in the group's image."""
+        return pygame.Rect(
+            (n % self.columns) * self.cellsize[0],
+            (n // self.columns) * self.cellsize[1] +
+            (self.cellsize[1] - self.boxsize[1]) // 2, self.boxsize[0],
+            self.boxsize[1])
+
+    def get(self, n):
+        """Return 1 if box n is checked, otherwise 0."""
+        return (self.bits[n >> 3] >> (n & 7)) & 1
+
+    def set(self, n, value, menu=None):
+        """This method checks (value 1) or unchecks (value 0) box n and draws
+        it again.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            n - This is the index of the box in the labels list.
+
+            value - This is the new state of the box.
+
+            menu - If the menu the group is on is given only the box is
+                reported as changed. Otherwise the whole group is.
+
+        (doc string updated ver 0.2)
+        """
+
+        if value:
+            self.bits[n >> 3] |= 1 << (n & 7)
         else:
-            # If the checkbox was previously unchecked, set the status
-            # to 1 and draw a check in the center of the checkbox.
-            self.status = 1
-            if self.checktype == 'r':
-                self.draw_rect_check()
-            elif self.checktype == 'c':
-                self.draw_circle_check()
-
-            # Draw the new image on the external surface
-            ptg.Button.set_position(self, self.position, self.midpoint,
-                                    self.surface)
+            self.bits[n >> 3] &= ~(1 << (n & 7)) & 0xFF
+
+        box = self.box_rect(n)
+        image = self.images[1 if value else 0]
+        self.image.blit(image, box)
+        if self.surface:
+            box = box.move(self.pos)
+            self.surface.blit(image, box)
+            if menu is not None and menu.sprites is None:
+                menu.mark_dirty(box)
+                return
+        self.dirty = 1
+
+    def toggle(self, n, menu=None):
+        """Flip the state of box n. See set for the inputs."""
+        self.set(n, not self.get(n), menu)
+
+    def box_at(self, pos):
+        """Return the index of the box whose box or label is at a position in
+        the group's image, or None if there is none there."""
+        column = pos[0] // self.cellsize[0]
+        n = (pos[1] // self.cellsize[1]) * self.columns + column
+        if 0 <= column < self.columns and pos[1] >= 0 and \
+                n < len(self.labels):
+            return n
+        return None
+
+    def __call__(self, menu, *args):
+        # Find the box under a left click in the group's image. The scroll
+        # wheel and other buttons do not toggle boxes.
+        event = menu.mouse_event
+        if event.button != 1:
+            return
+        n = self.box_at((event.pos[0] - menu.pos[0] - self.pos[0],
+                         event.pos[1] - menu.pos[1] - self.pos[1]))
+        if n is not None:
+            self.toggle(n, menu)
+
+    @property
+    def status(self):
+        return int.from_bytes(bytes(self.bits), 'little')
+
+    def states(self):
+        """Return a list of the state (0 or 1) of every box."""
+        return [self.get(n) for n in range(len(self.labels))]
+
+    def checked(self):
+        """Return a list of the labels of the checked boxes."""
+        return [self.labels[n] for n in range(len(self.labels))
+                if self.get(n)]
+
+
+class Lazyitems:
+    def __init__(self, iterable):
+        """Pulls the items of a generator or other iterable for a Scrolllist
+        only as far as they are needed, keeping the ones already pulled.
+
+        (doc string updated ver 0.2)
+        """
+        self.iterator = iter(iterable)
+        self.loaded = []
+        self.exhausted = False
+
+    def load(self, n):
+        """Pull items until item n is loaded. Returns False if the iterable
+        ran out first."""
+        while len(self.loaded) <= n and not self.exhausted:
+            try:
+                self.loaded.append(next(self.iterator))
+            except StopIteration:
+                self.exhausted = True
+        return n < len(self.loaded)
+
+    def __len__(self):
+        return len(self.loaded)
+
+    def __getitem__(self, n):
+        if not self.load(n):
+            raise IndexError('item index out of range')
+        return self.loaded[n]
+
+
+class Scrolllist(pygame.sprite.DirtySprite):
+    # The position of the screen the list is on, set by set_offset
+    offset = (0, 0)
+
+    def __init__(self, name, items, position, size, midpoint=False,
+                 surface=None, rowheight=32, fontsize=24, func=None,
+                 drawrow=None, scrollstep=3, background=(255, 255, 255),
+                 selectcolor=(67, 110, 238)):
+        """This widget shows a scrollable list of rows, such as saved games or
+        a leaderboard, that can hold thousands of items. Only the rows on the
+        screen are drawn and their surfaces are reused as the list scrolls.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            name - This is the name the menu's widget_status will pass for the
+                list.
+
+            items - This is a sequence (anything with len and indexing) or a
+                generator of the items to list. Items are only looked up when
+                their row comes into view, and a generator is only pulled as
+                far as the list has been scrolled.
+
+            position - This is the (x,y) position of the list in pixels.
+
+            size - This is the (width, height) of the list in pixels. A scroll
+                bar is drawn down the right edge.
+
+            midpoint - If true the position input will be treated as the
+                middle of the list instead of the top left corner.
+
+            surface - This is the surface that the list will be drawn on.
+
+            rowheight - This is the height of each row in pixels. The default
+                is 32.
+
+            fontsize - This is the size of the text of the rows drawn by the
+                default drawrow. The default is 24.
+
+            func - If a function is passed it is called with the index and
+                item of a row when the row is clicked.
+
+            drawrow - If a function is passed it is called with the row's
+                surface, item and a selected flag to draw a row, in place of
+                drawing str(item) as text.
+
+            scrollstep - This is the number of rows moved by one step of the
+                mouse wheel. The default is 3.
+
+            background - This is the rgb color behind the rows.
+
+            selectcolor - This is the rgb color behind the selected row.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            top - The index of the row at the top of the list.
+
+            status - The index of the selected row, or None. This is what
+                widget_status returns for the list.
+
+            rendered - The number of rows drawn so far, which only grows by
+                the rows that scroll into view.
+
+        Add the list to the menu's widgetlist. Clicking a row selects it,
+        clicking the scroll bar jumps to that part of the list and the mouse
+        wheel scrolls it.
+
+        (doc string updated ver 0.2)
+        """
+
+        # Initialize the sprite class
+        pygame.sprite.DirtySprite.__init__(self)
+        self.dirty = 0
+
+        self.name = name
+        if hasattr(items, '__len__') and hasattr(items, '__getitem__'):
+            self.items = items
+        else:
+            self.items = Lazyitems(items)
+        self.rowheight = rowheight
+        self.fontsize = fontsize
+        self.func = func
+        self.drawrow = drawrow if drawrow is not None else self.draw_text_row
+        self.scrollstep = scrollstep
+        self.background = background
+        self.selectcolor = selectcolor
+        self.barwidth = 8
+        self.rowwidth = size[0] - self.barwidth
+
+        self.top = 0
+        self.selected = None
+        self.rendered = 0
+
+        # One surface for each row that fits, reused as rows scroll by
+        self.fullrows = size[1] // rowheight
+        self.visible = -(-size[1] // rowheight)
+        self.free = [new_surface((self.rowwidth, rowheight))
+                     for i in range(self.visible)]
+        self.shown = {}
+
+        self.image = new_surface(size)
+        self.draw()
+
+        # Keep location information
+        self.position = position
+        self.midpoint = midpoint
+        self.surface = surface
+        ptg.Button.set_position(self, position, midpoint, surface)
+
+    def exists(self, n):
+        """Return True if there is an item n."""
+        if isinstance(self.items, Lazyitems):
+            return self.items.load(n)
+        return 0 <= n < len(self.items)
+
+    def count(self):
+        """Return the number of items, or the number pulled so far (plus one
+        if there are more) when the items come from a generator."""
+        if isinstance(self.items, Lazyitems):
+            return len(self.items) + (0 if self.items.exhausted else 1)
+        return len(self.items)
+
+    def draw_text_row(self, row, item, selected):
+        # The default drawrow, which writes the item as text
+        text = get_font(self.fontsize).render(str(item), 1, (0, 0, 0))
+        row.blit(text, (4, (row.get_height() - text.get_height()) // 2))
+
+    def render_row(self, row, n):
+        row.fill(self.selectcolor if n == self.selected else self.background)
+        self.drawrow(row, self.items[n], n == self.selected)
+        self.rendered += 1
+
+    def draw(self):
+        """Draw the rows in view and the scroll bar onto the list's image,
+        drawing only rows that were not already in view."""
+        needed = [n for n in range(self.top, self.top + self.visible)
+                  if self.exists(n)]
+
+        # Give back the surfaces of the rows that scrolled out of view
+        for n in list(self.shown):
+            if n not in needed:
+                self.free.append(self.shown.pop(n))
+        for n in needed:
+            if n not in self.shown:
+                row = self.shown[n] = self.free.pop()
+                self.render_row(row, n)
+
+        self.image.fill(self.background)
+        self.image.blits([(self.shown[n], (0, (n - self.top) * self.rowheight))
+                          for n in needed], False)
+
+        # Draw the scroll bar with a thumb the size of the part in view
+        height = self.image.get_height()
+        bar = pygame.Rect(self.rowwidth, 0, self.barwidth, height)
+        self.image.fill((200, 200, 200), bar)
+        count = max(self.count(), 1)
+        thumb = max(4, min(height, height * self.fullrows // count))
+        start = (height - thumb) * self.top // max(1, count - self.fullrows)
+        self.image.fill((100, 100, 100), (bar.x, min(start, height - thumb),
+                                          bar.width, thumb))
+
+    def redraw(self):
+        # Draw the list and show it on the external surface
+        self.draw()
+        self.blitinfo = (self.image, self.pos)
+        if self.surface:
+            self.surface.blit(*self.blitinfo)
+        self.dirty = 1
+
+    def refresh(self):
+        """Draw every row in view again, such as after the items changed."""
+        self.free.extend(self.shown.values())
+        self.shown.clear()
+        self.top = max(0, min(self.top, self.count() - self.fullrows))
+        self.redraw()
+
+    def scroll(self, rows):
+        """Move the list by the given number of rows."""
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, top):
+        """Show the list starting at row top, stopping at either end."""
+        if isinstance(self.items, Lazyitems):
+            self.items.load(top + self.fullrows)
+        top = max(0, min(top, self.count() - self.fullrows))
+        if top != self.top:
+            self.top = top
+            self.redraw()
+
+    def select(self, n):
+        """Select row n, or no row if n is None."""
+        old = self.selected
+        self.selected = n
+        for i in (old, n):
+            if i in self.shown:
+                self.render_row(self.shown[i], i)
+        self.redraw()
+
+    def __call__(self, menu, *args):
+        event = menu.mouse_event
+        if event.button == 4:
+            self.scroll(-self.scrollstep)
+            return
+        elif event.button == 5:
+            self.scroll(self.scrollstep)
+            return
+
+        x = event.pos[0] - menu.pos[0] - self.pos[0]
+        y = event.pos[1] - menu.pos[1] - self.pos[1]
+        if x >= self.rowwidth:
+            # Jump so the clicked part of the scroll bar is in the middle
+            self.scroll_to(y * self.count() // self.image.get_height() -
+                           self.fullrows // 2)
+            return
+        n = self.top + y // self.rowheight
+        if self.exists(n):
+            self.select(n)
+            if self.func is not None:
+                self.func(n, self.items[n])
+
+    @property
+    def status(self):
+        return self.selected
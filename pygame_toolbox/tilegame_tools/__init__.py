@@ -15,16 +15,73 @@
 # !/usr/bin/env python
 
 # Module Contents
+#   shade_surface
+#   composite
 #   Tile
 #   Tilelist
 #   Tilemap
 
 from .. import graphics as ptg
+from ..graphics.assets import load_image, new_surface
+from collections import OrderedDict
 import pygame
 import sys
 
 
+# Shade surfaces shared by every tile, keyed by (color or file, alpha, size)
+shadecache = {}
+
+# Tile images with shades drawn on them, keyed by the picture and the active
+# shade surfaces. The least recently used images are dropped past the limit.
+compositecache = OrderedDict()
+maxcomposites = 256
+
+
+def shade_surface(shade_color, alpha, size):
+    """Return the shared semi-transparent surface for a shade."""
+    key = (shade_color if type(shade_color) == str else tuple(shade_color),
+           alpha, tuple(size))
+    surface = shadecache.get(key)
+    if surface is None:
+        surface = new_surface(size)
+
+        # Fill the surface with a solid color or an image
+        if type(shade_color) == str:
+            surface.blit(load_image(shade_color, size), (0, 0))
+        else:
+            surface.fill(shade_color)
+        surface.set_alpha(alpha)
+        surface = shadecache[key] = surface
+    return surface
+
+
+def composite(pic, shades):
+    """Return the shared image of a picture with the given shade surfaces
+    drawn on it in order."""
+    if not shades:
+        return pic
+    key = (id(pic),) + tuple(id(i) for i in shades)
+    entry = compositecache.get(key)
+    if entry is not None:
+        compositecache.move_to_end(key)
+        return entry[0]
+
+    image = pic.copy()
+    for i in shades:
+        image.blit(i, (0, 0))
+
+    # Hold the picture and shades with the image so their ids stay unique
+    # while the key is in the cache
+    compositecache[key] = (image, pic, shades)
+    if len(compositecache) > maxcomposites:
+        compositecache.popitem(last=False)
+    return image
+
+
 class Tile(ptg.Button):
+    # The tilemap the tile is drawn on, which is told when the tile changes
+    owner = None
+
     def __init__(self, file, size):
         """This will load an image and resize it as specified. The class comes
         with shading features and can be used as a parent class for board game
@@ -32,20 +89,37 @@ class Tile(ptg.Button):
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         Inputs:
             file - This is a string of the picture file name including extension
+                or a region of an Atlas from the graphics assets module
 
             size - This is a tuple containing the length and height of the tile
 
-        (doc string updated ver 0.1)
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            image - The picture with the active shades drawn on it. Tiles with
+                the same picture and shades share the same surface, so copy it
+                before drawing on it.
+
+            shades - A dictionary of [on flag, shade surface] lists keyed by
+                shade name.
+
+            shademask - An integer with a bit set for every active shade, in
+                the order the shades were initialized.
+
+            file - The picture file the tile was made from.
+
+        (doc string updated ver 0.2)
         """
 
-        # Initialize button class and set the picture attribute of the instance
+        # Initialize button class and set the picture attribute of the
+        # instance. The picture is shared through the asset cache.
         ptg.Button.__init__(self, 1, file, (0, 0), resize=size)
-        self.pic = pygame.Surface(self.image.get_size())
-        self.pic.blit(self.image, (0, 0))
+        self.pic = self.image
+        self.file = file
 
         # Set up the shades dictionary. The first item determines if the shade
         # is on and the second item is the surface containing the shade.
         self.shades = {}
+        self.shademask = 0
 
         # Create blue and red shades for the tile
         self.initialize_shade('blue', (0, 0, 255), 150)
@@ -53,36 +127,26 @@ class Tile(ptg.Button):
 
     def initialize_shade(self, shade_name, shade_color, alpha):
         """This method will create semi-transparent surfaces with a specified
-        color. The surface can be toggled on and off.
+        color. The surface can be toggled on and off. Shades with the same
+        color, alpha and size are shared by every tile.
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         Inputs:
             Shade_name - String of the name that you want to associate with the
                 surface
 
-            Shade_color - An rgb tuple of the color of the shade
+            Shade_color - An rgb tuple of the color of the shade or a string
+                of a picture file name
 
             Alpha - Level of transparency of the shade (0-255 with 150 being a
                 good middle value)
 
-        (doc string updated ver 0.1)
+        (doc string updated ver 0.2)
         """
 
-        # Create the pygame surface
-        self.shades[shade_name] = [0, pygame.Surface(self.image.get_size())]
-
-        # Fill the surface with a solid color or an image
-        if type(shade_color) == str:
-            background = pygame.image.load(shade_color).convert()
-            background = pygame.transform.scale(background,
-                                                (self.image.get_width(),
-                                                 self.image.get_height()))
-            self.shades[shade_name][1].blit(background, (0, 0))
-        # Otherwise the background should contain an rgb value
-        else:
-            self.shades[shade_name][1].fill(shade_color)
-
-        # Set the alpha value for the shade
-        self.shades[shade_name][1].set_alpha(alpha)
+        if shade_name in self.shades and self.shades[shade_name][0]:
+            self.shademask &= ~(1 << list(self.shades).index(shade_name))
+        self.shades[shade_name] = [0, shade_surface(shade_color, alpha,
+                                                    self.pic.get_size())]
 
     def toggle_shade(self, shade):
         """This method will overlay a semi-transparent shade on top of the
@@ -92,7 +156,10 @@ class Tile(ptg.Button):
             shade - This will designate which shade you wish to turn on or off.
                 Blue and red shades are available by default.
 
-        (doc string updated ver 0.1)
+        The image for each combination of shades is drawn once and shared, so
+        toggling a shade swaps the tile's image instead of redrawing it.
+
+        (doc string updated ver 0.2)
         """
 
         # First toggle the user specified shade
@@ -100,21 +167,88 @@ class Tile(ptg.Button):
             self.shades[shade][0] = 0
         else:
             self.shades[shade][0] = 1
+        self.shademask ^= 1 << list(self.shades).index(shade)
+
+        # Now use the image with the active shades
+        self.image = composite(self.pic, tuple(
+            self.shades[key][1] for key in self.shades if self.shades[key][0]))
+        self.blitinfo = (self.image, self.pos)
 
-        # Now draw the image with the active shades
-        self.image.blit(self.pic, (0, 0))
-        for key in self.shades:
-            if self.shades[key][0]:
-                self.image.blit(self.shades[key][1], (0, 0))
+        # Report that the tile's image changed
+        self.dirty = 1
+        if self.owner is not None:
+            self.owner.tile_changed(self)
 
 
 class Tilelist(list):
     """This class will act as the holding spot for a matrix of tiles with
     additional processing methods that are specific to game making.
 
-    (doc string updated ver 0.1)
+    The list keeps an index of the row and column of every tile and tables of
+    the neighbours of every position so adjacent tile lookups do not search
+    the matrix. Assigning to or resizing the tilelist updates the index
+    automatically. If a row is resized in place call reindex.
+
+    (doc string updated ver 0.2)
     """
 
+    # The (row, column) offsets of each adjacent tile pattern
+    patterns = {'p': ((-1, 0), (1, 0), (0, -1), (0, 1)),
+                'x': ((-1, -1), (1, -1), (-1, 1), (1, 1))}
+    patterns['b'] = patterns['p'] + patterns['x']
+
+    def reindex(self):
+        """Forget the tile index and neighbour tables so they are rebuilt on
+        the next lookup."""
+        self.__dict__.pop('tileindex', None)
+        self.__dict__.pop('neighbours', None)
+
+    def coordinates(self, tile):
+        """This method returns the (row, column) of a tile in the tilelist.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            tile - This is the tile object to find.
+
+        (doc string updated ver 0.2)
+        """
+
+        index = self.__dict__.get('tileindex')
+        if index is not None:
+            location = index.get(id(tile))
+            # Check the index is still right in case the matrix was changed
+            # behind its back
+            if location is not None:
+                row, column = location
+                if (row < len(self) and column < len(self[row]) and
+                        self[row][column] is tile):
+                    return location
+
+        # Rebuild the index and look again
+        self.reindex()
+        index = self.tileindex = {}
+        for row in range(len(self)):
+            for column in range(len(self[row])):
+                index[id(self[row][column])] = (row, column)
+        if id(tile) not in index:
+            raise ValueError('The tile is not in the tilelist')
+        return index[id(tile)]
+
+    def neighbour_table(self, pattern):
+        """Return a dictionary of the (row, column) positions adjacent to
+        every position in the matrix for the given pattern."""
+        tables = self.__dict__.setdefault('neighbours', {})
+        table = tables.get(pattern)
+        if table is None:
+            offsets = self.patterns[pattern]
+            table = tables[pattern] = {}
+            for row in range(len(self)):
+                for column in range(len(self[row])):
+                    table[row, column] = [
+                        (row + i, column + j) for i, j in offsets
+                        if 0 <= row + i < len(self) and
+                        0 <= column + j < len(self[row + i])]
+        return table
+
     def adjacent_tiles(self, tile, pattern):
             """This will return a list of the tiles adjacent to a given tile.
             ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -129,58 +263,70 @@ class Tilelist(list):
                     'x' = diagonal
                     'b' = box
 
-            (doc string updated ver 0.1)
+            (doc string updated ver 0.2)
             """
 
-            # Initialize the list of tiles to return
-            adj_tiles = []
-
-            # Find the row and column of the input tile
-            for i in self:
-                for j in i:
-                    if j == tile:
-                        row = self.index(i)
-                        column = self[row].index(j)
-
-            # Define functions for the 2 distinct patterns
-            def plus_sign(self, row, column):
-                nonlocal adj_tiles
-                if row - 1 >= 0:
-                    adj_tiles += [self[row - 1][column]]
-                if row + 1 != len(self):
-                    adj_tiles += [self[row + 1][column]]
-                if column - 1 >= 0:
-                    adj_tiles += [self[row][column - 1]]
-                if column + 1 != len(self[row]):
-                    adj_tiles += [self[row][column + 1]]
-
-            def diagonal(self, row, column):
-                nonlocal adj_tiles
-                if column - 1 >= 0:
-                    if row - 1 >= 0:
-                        adj_tiles += [self[row - 1][column - 1]]
-                    if row + 1 != len(self):
-                        adj_tiles += [self[row + 1][column - 1]]
-                if column + 1 != len(self[row]):
-                    if row - 1 >= 0:
-                        adj_tiles += [self[row - 1][column + 1]]
-                    if row + 1 != len(self):
-                        adj_tiles += [self[row + 1][column + 1]]
-
-            # Return the tiles that form a plus sign with the given input tile
-            if pattern == 'p':
-                plus_sign(self, row, column)
-
-            # Return the tiles touching the four corners of the input tile
-            elif pattern == 'x':
-                diagonal(self, row, column)
-
-            # Return all of the tiles surrounding the input tile
-            elif pattern == 'b':
-                plus_sign(self, row, column)
-                diagonal(self, row, column)
-
-            return adj_tiles
+            # Find the row and column of the input tile and look up the
+            # positions around it
+            location = self.coordinates(tile)
+            return [self[row][column] for row, column in
+                    self.neighbour_table(pattern)[location]]
+
+    def adjacent_tiles_many(self, tiles, pattern):
+        """This will return a list with the list of adjacent tiles for each of
+        the given tiles. See adjacent_tiles for the inputs.
+
+        (doc string updated ver 0.2)
+        """
+
+        table = self.neighbour_table(pattern)
+        return [[self[row][column] for row, column in
+                 table[self.coordinates(tile)]] for tile in tiles]
+
+    # Any change to the outer list moves tiles so the index is dropped
+    def __setitem__(self, *args):
+        self.reindex()
+        return list.__setitem__(self, *args)
+
+    def __delitem__(self, *args):
+        self.reindex()
+        return list.__delitem__(self, *args)
+
+    def __iadd__(self, other):
+        self.reindex()
+        return list.__iadd__(self, other)
+
+    def append(self, *args):
+        self.reindex()
+        return list.append(self, *args)
+
+    def extend(self, *args):
+        self.reindex()
+        return list.extend(self, *args)
+
+    def insert(self, *args):
+        self.reindex()
+        return list.insert(self, *args)
+
+    def pop(self, *args):
+        self.reindex()
+        return list.pop(self, *args)
+
+    def remove(self, *args):
+        self.reindex()
+        return list.remove(self, *args)
+
+    def reverse(self):
+        self.reindex()
+        return list.reverse(self)
+
+    def sort(self, *args, **kargs):
+        self.reindex()
+        return list.sort(self, *args, **kargs)
+
+    def clear(self):
+        self.reindex()
+        return list.clear(self)
 
 
 class Tilemap(ptg.BaseScreen):
@@ -214,18 +360,27 @@ class Tilemap(ptg.BaseScreen):
         # Initialize the screen class
         ptg.BaseScreen.__init__(self, size)
 
-        # Create the list of tile objects and draw them on the screen
+        # Create the list of tile objects and draw them on the screen. The
+        # first index of the tilelist is the column and the second is the row.
         self.tilelist = tilelist
-        xlen = self.tilelist[0][0].image.get_width()
-        ylen = self.tilelist[0][0].image.get_height()
-        for x in range(0, size[0], xlen):
-            for y in range(0, size[1], ylen):
-                try:
-                    self.image.blit(self.tilelist[x // xlen][y // ylen].image,
-                                    (x, y))
-                    self.tilelist[x // xlen][y // ylen].set_position((x, y))
-                except:
-                    pass
+        self.xlen = self.tilelist[0][0].image.get_width()
+        self.ylen = self.tilelist[0][0].image.get_height()
+        self.columns = min(len(self.tilelist), -(-size[0] // self.xlen))
+        self.rows = -(-size[1] // self.ylen)
+        self.regular = True
+        blits = []
+        for i in range(self.columns):
+            for j in range(min(len(self.tilelist[i]), self.rows)):
+                tile = self.tilelist[i][j]
+                tile.set_position((i * self.xlen, j * self.ylen))
+                tile.owner = self
+                blits.append(tile.blitinfo)
+                if tile.image.get_size() != (self.xlen, self.ylen):
+                    self.regular = False
+        self.image.blits(blits, False)
+
+        # Tiles that changed since they were last drawn
+        self.dirty_tiles = {}
 
         # Set up an empty button list and the buttonflag
         self.buttonlist = []
@@ -254,37 +409,144 @@ class Tilemap(ptg.BaseScreen):
         """
 
         ptg.BaseScreen.set_offset(self, offset, mid)
-        for i in self.tilelist:
-            for j in i:
-                j.rect[0] += offset[0]
-                j.rect[1] += offset[1]
+
+        # Only the tiles drawn on the map are moved, so the tiles of a lazy
+        # tilelist that are off the map are not made
+        for j in self.drawn_tiles():
+            j.offset = self.pos
+            j.rect.topleft = (j.pos[0] + self.pos[0], j.pos[1] + self.pos[1])
+
+    def drawn_tiles(self):
+        """Return a list of the tiles drawn on the map image."""
+        return [self.tilelist[i][j] for i in range(self.columns)
+                for j in range(min(len(self.tilelist[i]), self.rows))]
+
+    def tile_changed(self, tile):
+        """Called by a tile drawn on this map when its image changes. The tile
+        is drawn again on the next frame."""
+        self.dirty_tiles[id(tile)] = tile
+
+    def redraw_tiles(self):
+        """This method draws the tiles that changed since the last frame onto
+        the map image and marks their cells as dirty, so only those cells are
+        presented in dirty rectangle mode.
+
+        (doc string updated ver 0.2)
+        """
+
+        blits = []
+        for tile in self.dirty_tiles.values():
+            if tile.owner is self:
+                blits.append((tile.image, tile.pos))
+                self.mark_dirty((tile.pos, tile.image.get_size()))
+                tile.dirty = 0
+        self.image.blits(blits, False)
+        self.dirty_tiles.clear()
+        if self.profiler is not None:
+            self.profiler.count('blits', len(blits))
+
+    def prepare_frame(self):
+        """Bring the map image up to date before a frame is presented. Returns
+        True if anything was drawn."""
+        if not self.dirty_tiles:
+            return False
+        if self.sprites is not None:
+            # The sprite group draws the changed tiles on the display. They
+            # are still drawn on the map image, without marking them dirty, so
+            # the image is up to date if sprite mode is turned off.
+            self.image.blits([(tile.image, tile.pos) for tile in
+                              self.dirty_tiles.values() if tile.owner is self],
+                             False)
+            self.dirty_tiles.clear()
+            return True
+        self.redraw_tiles()
+        return True
+
+    def sprite_list(self):
+        """Return the tiles drawn on the map and the buttons."""
+        return self.drawn_tiles() + self.buttonlist
+
+    def handle_event(self, event):
+        """Subclasses can override this to use events in the update loop.
+        Returning True stops the event from being checked for clicks."""
+        return False
+
+    def tile_at(self, pos):
+        """This method returns the tile drawn under a position on the display,
+        or None if there is no tile there.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            pos - This is the x, y position on the display, such as the pos
+                attribute of a mouse event.
+
+        When every tile is the same size the column and row are found by
+        dividing by the tile size. Maps with tiles of different sizes fall
+        back to testing the rectangle of each drawn tile.
+
+        (doc string updated ver 0.2)
+        """
+
+        # Move the position into the coordinates of the map image
+        x = pos[0] - self.pos[0]
+        y = pos[1] - self.pos[1]
+        if not self.image.get_rect().collidepoint(x, y):
+            return None
+
+        if self.regular:
+            column = x // self.xlen
+            row = y // self.ylen
+            if column < self.columns and row < len(self.tilelist[column]):
+                return self.tilelist[column][row]
+            return None
+
+        # Tiles drawn later cover earlier ones so search from the last drawn
+        for i in reversed(range(self.columns)):
+            for j in reversed(range(min(len(self.tilelist[i]), self.rows))):
+                tile = self.tilelist[i][j]
+                if pygame.Rect(tile.pos, tile.image.get_size()).collidepoint(
+                        x, y):
+                    return tile
+        return None
 
     def update(self, screen, clock):
 
-        def find_mouse():
-            return pygame.mouse.get_pos()
+        # The first frame is always presented in full
+        self.fullredraw = True
 
         while True:
-            clock.tick(30)
-            for event in pygame.event.get():
+            events = self.get_events(clock)
+            for event in events:
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
 
+                # Let subclasses use the event first
+                if self.handle_event(event):
+                    continue
+
                 # If the button flag is set to 1 return any tile clicked
                 if self.buttonflag:
-                    for i in self.tilelist:
-                        for x in i:
-                            if (event.type == pygame.MOUSEBUTTONUP and
-                                    x.rect.collidepoint(find_mouse())):
-                                return x
+                    if event.type == pygame.MOUSEBUTTONUP:
+                        if self.profiler is not None:
+                            self.profiler.start('hit')
+                        x = self.tile_at(event.pos)
+                        if self.profiler is not None:
+                            self.profiler.stop('hit')
+                        if x is not None:
+                            return x
                 # If the button flag is not set to one use a list of buttons
                 # and call the function of any button that is called.
-                else:
-                    for i in self.buttonlist:
-                        if (event.type == pygame.MOUSEBUTTONUP and
-                                i.rect.collidepoint(find_mouse())):
-                            return i()
-
-            screen.blit(self.image, self.pos)
-            pygame.display.flip()
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    i = self.hit_test(event.pos)
+                    if i is not None:
+                        return i()
+
+            # Draw any tiles that changed before presenting the frame
+            if self.profiler is not None:
+                self.profiler.start('draw')
+                drawn = self.prepare_frame()
+                self.profiler.stop('draw')
+            else:
+                drawn = self.prepare_frame()
+            if drawn or self.needs_redraw(events):
+                self.present(screen)
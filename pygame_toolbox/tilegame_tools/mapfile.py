@@ -0,0 +1,298 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.tilegame_tools.mapfile.py
+# Purpose:     This module saves tilelists to a compact binary map file and
+#              loads them back lazily through a memory map
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   save_tilelist
+#   load_tilelist
+#   Mapfile
+#   Lazytiles
+
+# File layout (little endian):
+#   header - magic b'PTTM', version (H), first and second tilelist lengths
+#            (I, I), tile width and height (H, H), number of tile types (H)
+#            and number of state layers (H)
+#   the tile type names and then the layer names, each as a length (H)
+#            followed by utf-8 bytes
+#   padding to a multiple of 8 bytes
+#   the type id (H) of every tile, in tilelist order
+#   padding to a multiple of 4 bytes
+#   every state layer as signed integers (i), in tilelist order
+
+from . import Tile, Tilelist
+import mmap
+import struct
+
+MAGIC = b'PTTM'
+VERSION = 1
+HEADER = struct.Struct('<4sHIIHHHH')
+
+
+def pad(offset, size):
+    return -offset % size
+
+
+def save_tilelist(tilelist, file, layers=('status', 'shademask')):
+    """This function writes a tilelist to a map file.
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    Inputs:
+        tilelist - This is the list of lists of tiles to save. Every inner
+            list should be the same length and every tile the same size.
+
+        file - This is the file name to write.
+
+        layers - These are the names of the integer tile attributes to save
+            as state layers. Tiles without the attribute save 0. The
+            'shademask' layer restores the active shades when loaded.
+
+    The picture file of each tile is saved once in a table of tile types and
+    each tile is stored as its two byte type id.
+
+    (doc string updated ver 0.2)
+    """
+
+    shape = (len(tilelist), len(tilelist[0]))
+    size = tilelist[0][0].pic.get_size()
+
+    # Number the tile types in the order they are first seen
+    types = {}
+    ids = []
+    for i in tilelist:
+        if len(i) != shape[1]:
+            raise ValueError('Every list in the tilelist must be the same '
+                             'length')
+        for j in i:
+            if type(j.file) != str:
+                raise ValueError('Only tiles made from picture files can be '
+                                 'saved')
+            ids.append(types.setdefault(j.file, len(types)))
+    if len(types) > 0xFFFF:
+        raise ValueError('A map can hold at most 65535 tile types')
+
+    with open(file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, shape[0], shape[1], size[0],
+                            size[1], len(types), len(layers)))
+        for name in list(types) + list(layers):
+            name = name.encode('utf-8')
+            f.write(struct.pack('<H', len(name)) + name)
+        f.write(b'\0' * pad(f.tell(), 8))
+        f.write(struct.pack('<%dH' % len(ids), *ids))
+        f.write(b'\0' * pad(f.tell(), 4))
+        for name in layers:
+            f.write(struct.pack('<%di' % len(ids), *[
+                int(getattr(j, name, 0)) for i in tilelist for j in i]))
+
+
+class Mapfile:
+    def __init__(self, file, writable=False):
+        """This class memory maps a map file so tile types and state can be
+        read without loading the whole file.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            file - This is the file name of the map file.
+
+            writable - If True state layer values can be written back to the
+                file with set_value.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            shape - The lengths of the first and second index of the map.
+
+            size - The (width, height) of the tiles.
+
+            types - The list of tile picture files indexed by type id.
+
+            layers - The list of state layer names.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.file = open(file, 'r+b' if writable else 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=(
+            mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ))
+        self.writable = writable
+
+        (magic, version, n0, n1, width, height, ntypes,
+         nlayers) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s is not a map file' % file)
+        self.shape = (n0, n1)
+        self.size = (width, height)
+
+        # Read the type and layer names
+        offset = HEADER.size
+        names = []
+        for i in range(ntypes + nlayers):
+            length = struct.unpack_from('<H', self.map, offset)[0]
+            offset += 2
+            names.append(self.map[offset:offset + length].decode('utf-8'))
+            offset += length
+        self.types = names[:ntypes]
+        self.layers = names[ntypes:]
+
+        # View the tile ids and layers in place
+        count = n0 * n1
+        offset += pad(offset, 8)
+        self.ids = memoryview(self.map)[offset:offset + 2 * count].cast('H')
+        offset += 2 * count
+        offset += pad(offset, 4)
+        self.layerdata = {}
+        for name in self.layers:
+            self.layerdata[name] = memoryview(self.map)[
+                offset:offset + 4 * count].cast('i')
+            offset += 4 * count
+
+    def type_id(self, i, j):
+        """Return the type id of the tile at tilelist[i][j]."""
+        return self.ids[i * self.shape[1] + j]
+
+    def value(self, name, i, j):
+        """Return the value of a state layer for the tile at tilelist[i][j]."""
+        return self.layerdata[name][i * self.shape[1] + j]
+
+    def set_value(self, name, i, j, value):
+        """Write the value of a state layer for the tile at tilelist[i][j]."""
+        self.layerdata[name][i * self.shape[1] + j] = value
+
+    def close(self):
+        """Release the memory map and close the file."""
+        self.ids.release()
+        for view in self.layerdata.values():
+            view.release()
+        self.map.close()
+        self.file.close()
+
+
+class Lazycolumn:
+    # One inner list of a Lazytiles, made on demand
+    def __init__(self, tiles, i):
+        self.tiles = tiles
+        self.i = i
+
+    def __len__(self):
+        return self.tiles.map.shape[1]
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += len(self)
+        if not 0 <= j < len(self):
+            raise IndexError('tile index out of range')
+        return self.tiles.tile(self.i, j)
+
+    def __iter__(self):
+        for j in range(len(self)):
+            yield self.tiles.tile(self.i, j)
+
+
+class Lazytiles:
+    def __init__(self, mapfile, factory=Tile):
+        """This class acts like a tilelist for a map file, making each tile
+        object the first time it is looked up. It can be passed to Tilemap or
+        the Scrollmap from the viewport module, which only make the tiles of
+        the chunks that come into view.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            mapfile - This is a Mapfile or the file name of a map file.
+
+            factory - This is called with the picture file and tile size to
+                make each tile. The default is the Tile class.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            made - A dictionary of the tiles that have been made, keyed by
+                (i, j).
+
+        Tiles given back with release have their state layers saved, to the
+        file if it is writable and otherwise in memory, so they come back the
+        same the next time they are made.
+
+        (doc string updated ver 0.2)
+        """
+
+        if not isinstance(mapfile, Mapfile):
+            mapfile = Mapfile(mapfile)
+        self.map = mapfile
+        self.factory = factory
+        self.made = {}
+        self.saved = {}
+
+    def __len__(self):
+        return self.map.shape[0]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('tile index out of range')
+        return Lazycolumn(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Lazycolumn(self, i)
+
+    def tile(self, i, j):
+        """Return the tile at [i][j], making it if needed."""
+        tile = self.made.get((i, j))
+        if tile is not None:
+            return tile
+
+        tile = self.factory(self.map.types[self.map.type_id(i, j)],
+                            self.map.size)
+        values = self.saved.pop((i, j), None)
+        for name in self.map.layers:
+            value = (values[name] if values is not None else
+                     self.map.value(name, i, j))
+            if name == 'shademask':
+                for n, key in enumerate(list(tile.shades)):
+                    if value & (1 << n):
+                        tile.toggle_shade(key)
+            elif value or hasattr(tile, name):
+                setattr(tile, name, value)
+        self.made[(i, j)] = tile
+        return tile
+
+    def release(self, keys):
+        """This method forgets the tiles at the given (i, j) keys so their
+        memory can be reclaimed, saving their state layers first.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            keys - This is a list of (i, j) positions to release.
+
+        (doc string updated ver 0.2)
+        """
+
+        for key in keys:
+            tile = self.made.pop(key, None)
+            if tile is None:
+                continue
+            values = dict((name, int(getattr(tile, name, 0)))
+                          for name in self.map.layers)
+            if self.map.writable:
+                for name, value in values.items():
+                    self.map.set_value(name, key[0], key[1], value)
+            elif any(values[name] != self.map.value(name, *key)
+                     for name in values):
+                self.saved[key] = values
+
+    def to_tilelist(self):
+        """Make every tile and return them as a Tilelist."""
+        return Tilelist([list(i) for i in self])
+
+
+def load_tilelist(file, factory=Tile):
+    """Read a whole map file into a Tilelist. See Lazytiles for the inputs."""
+    tiles = Lazytiles(file, factory)
+    tilelist = tiles.to_tilelist()
+    tiles.map.close()
+    return tilelist
@@ -0,0 +1,353 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.tilegame_tools.pathfinding.py
+# Purpose:     This module finds shortest paths, movement ranges and distance
+#              fields on the grid of a tilelist
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Pathfinder
+
+from collections import deque, OrderedDict
+import heapq
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Pathfinder:
+    def __init__(self, tilelist, cost=None, pattern='p', tilestate=None):
+        """This class finds paths between the tiles of a tilelist using the
+        same adjacent tile patterns as Tilelist.adjacent_tiles.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            tilelist - This is the Tilelist to move around. Positions are
+                (row, column) the same way as the tilelist is indexed.
+
+            cost - This is an array (or list of lists) of the cost of entering
+                each tile. Tiles with a cost of 0 or less, or an infinite cost,
+                are blocked. By default every tile costs 1. If a tilestate is
+                given this is the name of the layer to use as the cost.
+
+            pattern - This is the adjacent tile pattern used for moving.
+                'p' = plus sign (default)
+                'x' = diagonal
+                'b' = box
+
+            tilestate - If a Tilestate is given the cost is read from one of
+                its layers and the cached results are thrown away whenever
+                that layer's version changes.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            cost - The float array of tile costs. If it is changed directly
+                call invalidate so the cached results are recomputed.
+
+            maxcache - The most results kept in the cache. The least recently
+                used results are dropped past it. The default is 64.
+
+        Start and goal inputs can be tiles or (row, column) tuples. Results
+        are cached until the cost changes.
+
+        (doc string updated ver 0.2)
+        """
+
+        if numpy is None:
+            raise ImportError('Pathfinder needs NumPy to be installed')
+
+        self.tilelist = tilelist
+        self.pattern = pattern
+        self.offsets = tilelist.patterns[pattern]
+        self.shape = (len(tilelist), max(len(i) for i in tilelist))
+        self.tilestate = tilestate
+        self.layername = cost if tilestate is not None else None
+        # Results keyed by the method and its inputs. The least recently used
+        # results are dropped past maxcache.
+        self.cache = OrderedDict()
+        self.maxcache = 64
+        self.version = None
+
+        # Positions without a tile are always blocked
+        self.present = numpy.zeros(self.shape, bool)
+        for row in range(len(tilelist)):
+            self.present[row, :len(tilelist[row])] = True
+
+        if tilestate is None:
+            self.set_cost(cost)
+        else:
+            self.read_cost()
+
+    def set_cost(self, cost):
+        """Replace the cost array and clear the cached results."""
+        if cost is None:
+            self.cost = numpy.ones(self.shape)
+        else:
+            self.cost = numpy.array(cost, float)
+        self.cost[~self.present] = numpy.inf
+        self.cost[self.cost <= 0] = numpy.inf
+        self.invalidate()
+
+    def read_cost(self):
+        """Copy the cost layer out of the tilestate."""
+        self.set_cost(self.tilestate.layer(self.layername))
+        self.version = self.tilestate.versions[self.layername]
+
+    def invalidate(self):
+        """Throw away every cached result."""
+        self.cache.clear()
+
+    def check_cache(self):
+        # Reread the cost layer if the tilestate changed it
+        if (self.tilestate is not None and
+                self.tilestate.versions[self.layername] != self.version):
+            self.read_cost()
+
+    def cached(self, key):
+        # Return a cached result, or None, marking it as recently used
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+        return result
+
+    def store(self, key, result):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxcache:
+            self.cache.popitem(last=False)
+        return result
+
+    def position(self, tile):
+        """Return the (row, column) of a tile or of a (row, column) tuple."""
+        if isinstance(tile, tuple):
+            return tile
+        return self.tilelist.coordinates(tile)
+
+    def neighbours(self, row, column):
+        for i, j in self.offsets:
+            r = row + i
+            c = column + j
+            if (0 <= r < self.shape[0] and 0 <= c < self.shape[1] and
+                    self.cost[r, c] != math.inf):
+                yield r, c
+
+    def results(self, path, tiles):
+        if path is None:
+            return None
+        if tiles:
+            return [self.tilelist[row][column] for row, column in path]
+        return numpy.array(path, int).reshape(-1, 2)
+
+    def bfs(self, start, goal, tiles=True):
+        """This method returns the path with the fewest moves from start to
+        goal, ignoring the tile costs other than blocked tiles. The path
+        includes the start and the goal. None is returned if there is no path.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            start - This is the tile or (row, column) to start from.
+
+            goal - This is the tile or (row, column) to reach.
+
+            tiles - If True a list of tiles is returned, otherwise an (n, 2)
+                array of (row, column) positions.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.check_cache()
+        start = self.position(start)
+        goal = self.position(goal)
+        key = ('bfs', start, goal)
+        path = self.cached(key)
+        if path is None and key not in self.cache:
+            came_from = {start: None}
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                if current == goal:
+                    break
+                for nxt in self.neighbours(*current):
+                    if nxt not in came_from:
+                        came_from[nxt] = current
+                        queue.append(nxt)
+            path = self.store(key, self.walk_back(came_from, goal))
+        return self.results(path, tiles)
+
+    def dijkstra(self, start, goal, tiles=True):
+        """This method returns the cheapest path from start to goal using the
+        tile costs. See bfs for the inputs.
+
+        (doc string updated ver 0.2)
+        """
+
+        return self.astar(start, goal, tiles, heuristic=False)
+
+    def astar(self, start, goal, tiles=True, heuristic=True):
+        """This method returns the cheapest path from start to goal using the
+        tile costs and a binary heap. The distance to the goal guides the
+        search so fewer tiles are visited than with dijkstra. See bfs for the
+        inputs.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.check_cache()
+        start = self.position(start)
+        goal = self.position(goal)
+        key = ('cost', start, goal)
+        path = self.cached(key)
+        if path is not None or key in self.cache:
+            return self.results(path, tiles)
+
+        # The heuristic never overestimates: each move costs at least the
+        # cheapest tile and covers at most one row and one column
+        if heuristic:
+            finite = self.cost[self.cost != math.inf]
+            cheapest = float(finite.min()) if finite.size else 0.0
+            diagonal = self.pattern != 'p'
+        else:
+            cheapest = 0.0
+
+        def estimate(position):
+            if not cheapest:
+                return 0.0
+            rows = abs(position[0] - goal[0])
+            columns = abs(position[1] - goal[1])
+            if diagonal:
+                return cheapest * max(rows, columns)
+            return cheapest * (rows + columns)
+
+        came_from = {start: None}
+        distance = {start: 0.0}
+        heap = [(estimate(start), 0.0, start)]
+        while heap:
+            priority, dist, current = heapq.heappop(heap)
+            if current == goal:
+                break
+            if dist > distance[current]:
+                continue
+            for nxt in self.neighbours(*current):
+                newdist = dist + self.cost[nxt]
+                if newdist < distance.get(nxt, math.inf):
+                    distance[nxt] = newdist
+                    came_from[nxt] = current
+                    heapq.heappush(heap, (newdist + estimate(nxt), newdist,
+                                          nxt))
+
+        path = self.store(key, self.walk_back(came_from, goal))
+        return self.results(path, tiles)
+
+    @staticmethod
+    def walk_back(came_from, goal):
+        if goal not in came_from:
+            return None
+        path = []
+        current = goal
+        while current is not None:
+            path.append(current)
+            current = came_from[current]
+        path.reverse()
+        return path
+
+    def distance_field(self, sources, weighted=True):
+        """This method returns an array of the cheapest cost from any of the
+        sources to every tile on the board. Unreachable and blocked tiles are
+        infinite. The tiles are searched outward from every source at once
+        with a binary heap, the same as dijkstra without a goal.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            sources - This is a tile, a (row, column) tuple or a list of
+                either to measure from.
+
+            weighted - If True the tile costs are used, otherwise every move
+                costs 1.
+
+        The array returned is shared with the cache so it should not be
+        changed.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.check_cache()
+        if isinstance(sources, tuple) or not isinstance(sources, list):
+            sources = [sources]
+        sources = tuple(sorted(self.position(i) for i in sources))
+        key = ('field', sources, weighted)
+        field = self.cached(key)
+        if field is not None:
+            return field
+
+        # Search outward from every source at once with a binary heap
+        field = numpy.full(self.shape, math.inf)
+        heap = []
+        for position in sources:
+            field[position] = 0.0
+            heap.append((0.0, position))
+        heapq.heapify(heap)
+        while heap:
+            dist, current = heapq.heappop(heap)
+            if dist > field[current]:
+                continue
+            for nxt in self.neighbours(*current):
+                newdist = dist + (self.cost[nxt] if weighted else 1.0)
+                if newdist < field[nxt]:
+                    field[nxt] = newdist
+                    heapq.heappush(heap, (newdist, nxt))
+
+        field.setflags(write=False)
+        return self.store(key, field)
+
+    def reachable(self, start, budget, tiles=True):
+        """This method returns the tiles that can be reached from start for
+        at most the given total cost, such as the movement range of a piece.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            start - This is the tile or (row, column) to start from.
+
+            budget - This is the largest total cost allowed.
+
+            tiles - If True a list of tiles is returned, otherwise an (n, 2)
+                array of (row, column) positions.
+
+        Only the tiles within the budget are searched, with a binary heap, so
+        small ranges on large boards stay cheap.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.check_cache()
+        start = self.position(start)
+        key = ('reach', start, budget)
+        positions = self.cached(key)
+        if positions is None:
+            distance = {start: 0.0}
+            heap = [(0.0, start)]
+            while heap:
+                dist, current = heapq.heappop(heap)
+                if dist > distance[current]:
+                    continue
+                for nxt in self.neighbours(*current):
+                    newdist = dist + self.cost[nxt]
+                    # Tiles past the budget are never searched from
+                    if (newdist <= budget and
+                            newdist < distance.get(nxt, math.inf)):
+                        distance[nxt] = newdist
+                        heapq.heappush(heap, (newdist, nxt))
+            positions = numpy.array(sorted(distance), int).reshape(-1, 2)
+            positions.setflags(write=False)
+            self.store(key, positions)
+
+        if tiles:
+            return [self.tilelist[row][column] for row, column in
+                    positions.tolist()]
+        return positions
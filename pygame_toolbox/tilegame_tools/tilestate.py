@@ -0,0 +1,203 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.tilegame_tools.tilestate.py
+# Purpose:     This module holds an array backed copy of the state of the tiles
+#              in a tilelist so board wide questions can be answered without
+#              looping over the tile objects
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Tilestate
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Tilestate:
+    def __init__(self, tilelist, dtype='int32'):
+        """This class stores the integer state of every tile of a tilelist in
+        NumPy arrays, one array (layer) per piece of state. Queries, masks and
+        bulk updates work on the arrays and sync writes the values that changed
+        back to the tiles.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            tilelist - This is the Tilelist (a list of rows of tiles) to hold
+                the state of. The arrays are indexed [row, column] the same
+                way as the tilelist.
+
+            dtype - This is the NumPy type of the layers. The default is
+                'int32'.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            layers - A dictionary of the arrays keyed by layer name. Every
+                tile shade has a layer named 'shade:' plus the shade name
+                (1 when the shade is on) and the tile status attribute has the
+                layer 'status'. Other layers can be made with add_layer.
+
+            present - A boolean array that is True where the tilelist has a
+                tile. Rows of different lengths leave the rest False.
+
+            versions - A dictionary counting the changes made to each layer
+                through this class, so other code can tell when to recompute.
+
+        NumPy is needed for this class but not for the rest of the toolbox.
+
+        (doc string updated ver 0.2)
+        """
+
+        if numpy is None:
+            raise ImportError('Tilestate needs NumPy to be installed')
+
+        self.tilelist = tilelist
+        self.dtype = dtype
+        self.shape = (len(tilelist), max(len(i) for i in tilelist))
+        self.present = numpy.zeros(self.shape, bool)
+        for row in range(len(tilelist)):
+            self.present[row, :len(tilelist[row])] = True
+
+        self.layers = {}
+        self.synced = {}
+        self.attributes = {}
+        self.versions = {}
+
+        # Make the status and shade layers from the current tiles
+        self.add_layer('status', attribute='status')
+        shades = []
+        for i in tilelist:
+            for j in i:
+                for key in j.shades:
+                    if key not in shades:
+                        shades.append(key)
+        for key in shades:
+            self.add_layer('shade:' + key)
+        self.pull()
+
+    def add_layer(self, name, fill=0, attribute=None):
+        """This method adds a new layer of state.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            name - This is the name of the layer.
+
+            fill - This is the starting value of every tile. The default is 0.
+
+            attribute - If the name of a tile attribute is given, pull reads
+                the layer from that attribute and sync writes changed values
+                back to it. Otherwise the layer only lives in the array.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.layers[name] = numpy.full(self.shape, fill, self.dtype)
+        self.synced[name] = self.layers[name].copy()
+        self.attributes[name] = attribute
+        self.versions[name] = 0
+        return self.layers[name]
+
+    def layer(self, name):
+        """Return the array of a layer. Changes made directly to the array are
+        written to the tiles by sync; call touch afterwards so the layer's
+        version goes up."""
+        return self.layers[name]
+
+    def touch(self, name):
+        """Report that a layer was changed directly."""
+        self.versions[name] += 1
+
+    def pull(self):
+        """Read every layer that mirrors the tiles from the tile objects."""
+        for row in range(len(self.tilelist)):
+            for column in range(len(self.tilelist[row])):
+                tile = self.tilelist[row][column]
+                for name, array in self.layers.items():
+                    if name.startswith('shade:'):
+                        shade = tile.shades.get(name[6:])
+                        array[row, column] = shade[0] if shade else 0
+                    elif self.attributes[name] is not None:
+                        array[row, column] = getattr(
+                            tile, self.attributes[name], 0)
+        for name in self.layers:
+            self.synced[name][...] = self.layers[name]
+            self.versions[name] += 1
+
+    def mask(self, name, value):
+        """Return a boolean array that is True where the layer equals value
+        and a tile is present."""
+        return (self.layers[name] == value) & self.present
+
+    def count(self, name, value=None):
+        """Count the tiles in a layer. If a value is given return the number
+        of tiles with that value, otherwise return a dictionary of the number
+        of tiles with each value."""
+        values = self.layers[name][self.present]
+        if value is not None:
+            return int(numpy.count_nonzero(values == value))
+        keys, counts = numpy.unique(values, return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+    def coordinates(self, mask):
+        """Return an (n, 2) array of the (row, column) of every tile where the
+        mask is True."""
+        return numpy.argwhere(mask & self.present)
+
+    def tiles(self, mask):
+        """Return a list of the tiles where the mask is True."""
+        return [self.tilelist[row][column] for row, column in
+                self.coordinates(mask).tolist()]
+
+    def set(self, name, where, value):
+        """This method sets the value of a layer for many tiles at once.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            name - This is the name of the layer.
+
+            where - This is a boolean mask or any NumPy index of the tiles to
+                change.
+
+            value - This is the new value, or an array of values.
+
+        The tiles are not changed until sync is called.
+
+        (doc string updated ver 0.2)
+        """
+
+        self.layers[name][where] = value
+        self.versions[name] += 1
+
+    def sync(self):
+        """This method writes the values that changed since the last sync to
+        the tiles, toggling shades and setting attributes only on those tiles.
+        It returns the number of tile values that were written.
+
+        (doc string updated ver 0.2)
+        """
+
+        written = 0
+        for name, array in self.layers.items():
+            attribute = self.attributes[name]
+            if not name.startswith('shade:') and attribute is None:
+                continue
+            changed = numpy.argwhere((array != self.synced[name]) &
+                                     self.present)
+            for row, column in changed.tolist():
+                tile = self.tilelist[row][column]
+                value = int(array[row, column])
+                if name.startswith('shade:'):
+                    shade = tile.shades.get(name[6:])
+                    if shade is not None and bool(shade[0]) != bool(value):
+                        tile.toggle_shade(name[6:])
+                else:
+                    setattr(tile, attribute, value)
+                written += 1
+            self.synced[name][...] = array
+        return written
@@ -0,0 +1,290 @@
+# ------------------------------------------------------------------------------
+# Name:        pygame_toolbox.tilegame_tools.viewport.py
+# Purpose:     This module holds a tilemap that can be larger than the screen
+#              and is scrolled with a camera
+#
+# Contributors: James Milam
+#
+# Created:     18/10/2026
+# Copyright:   (c) James 2015
+# Licence:     MIT Licence
+# Version:     0.2
+# Written for: Python 3.3
+# ------------------------------------------------------------------------------
+# !/usr/bin/env python
+
+# Module Contents
+#   Scrollmap
+
+from .. import graphics as ptg
+from ..graphics.assets import new_surface
+from . import Tilemap
+from collections import OrderedDict
+import pygame
+
+
+class Scrollmap(Tilemap):
+    def __init__(self, size, tilelist, buttonflag, chunksize=(16, 16),
+                 budget=32 * 1024 * 1024):
+        """This class draws a map of tiles that can be larger than the screen.
+        The screen shows the part of the map under a camera that can be moved
+        with the arrow keys, the mouse wheel or the scroll methods.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            size - This is the (x,y) size of the screen.
+
+            tilelist - This is a list of tile objects to be drawn. The same as
+                with Tilemap the first index is the column and the second is
+                the row, and every tile should be the same size.
+
+            buttonflag - If a 1 is passed the update function will return a tile
+                that was clicked. If a 0 is passed the update function will
+                check the buttons in the button list and call the function of
+                a button that was clicked.
+
+            chunksize - This is the (columns, rows) of tiles drawn together
+                into one cached chunk surface. The default is (16, 16).
+
+            budget - This is the number of bytes of chunk surfaces that are
+                kept. The least recently used chunks off the screen are dropped
+                past the budget. The default is 32 MB.
+
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Important Attributes:
+            camera - The (x,y) position of the map, in pixels, shown at the top
+                left corner of the screen.
+
+            chunks - The cached chunk surfaces keyed by (column, row) of chunk.
+
+            buttonlist - Buttons added to this list are drawn over the map
+                every time the chunks are drawn, and are clicked the same way
+                as on a Tilemap when 0 is passed for buttonflag.
+
+        Only the chunks that touch the screen are drawn, and only when the
+        camera moves, so the cost of a frame depends on the screen size and
+        not the map size. Tiles are positioned in map coordinates when their
+        chunk is first drawn.
+
+        (doc string updated ver 0.2)
+        """
+
+        # Initialize the screen class
+        ptg.BaseScreen.__init__(self, size)
+
+        self.tilelist = tilelist
+        self.xlen = self.tilelist[0][0].image.get_width()
+        self.ylen = self.tilelist[0][0].image.get_height()
+        self.columns = len(self.tilelist)
+        self.rows = max(len(self.tilelist[i]) for i in range(self.columns))
+        self.regular = True
+        self.worldsize = (self.columns * self.xlen, self.rows * self.ylen)
+
+        self.chunksize = chunksize
+        self.chunkpixels = (chunksize[0] * self.xlen, chunksize[1] * self.ylen)
+        self.budget = budget
+        self.chunks = OrderedDict()
+        self.chunkbytes = 0
+
+        self.camera = (0, 0)
+        self.moved = True
+        self.scrollstep = (self.xlen, self.ylen)
+
+        # Set up an empty button list, the buttonflag and the changed tiles
+        self.buttonlist = []
+        self.buttonflag = buttonflag
+        self.dirty_tiles = {}
+
+    def set_offset(self, offset, mid=None):
+        # Tiles are found from the camera so only the buttons need moving
+        ptg.BaseScreen.set_offset(self, offset, mid)
+
+    def set_sprite_mode(self, spritemode=True):
+        # Tiles are drawn through the chunk cache, which already only draws
+        # what changed
+        if spritemode:
+            raise ValueError('A Scrollmap can not be drawn in sprite mode')
+        ptg.BaseScreen.set_sprite_mode(self, False)
+
+    def set_camera(self, position):
+        """This method moves the camera so the given map position (in pixels)
+        is at the top left of the screen. The camera stops at the edges of the
+        map."""
+        size = self.image.get_size()
+        x = max(0, min(int(position[0]), self.worldsize[0] - size[0]))
+        y = max(0, min(int(position[1]), self.worldsize[1] - size[1]))
+        if (x, y) != self.camera:
+            self.camera = (x, y)
+            self.moved = True
+
+    def scroll(self, dx, dy):
+        """Move the camera by dx, dy pixels."""
+        self.set_camera((self.camera[0] + dx, self.camera[1] + dy))
+
+    def center_on(self, column, row):
+        """Move the camera so the tile at column, row is in the middle of the
+        screen."""
+        size = self.image.get_size()
+        self.set_camera(((column + 0.5) * self.xlen - size[0] // 2,
+                         (row + 0.5) * self.ylen - size[1] // 2))
+
+    def visible_chunks(self):
+        """Return the (column, row) of every chunk that touches the screen."""
+        size = self.image.get_size()
+        left = self.camera[0] // self.chunkpixels[0]
+        top = self.camera[1] // self.chunkpixels[1]
+        right = (min(self.camera[0] + size[0], self.worldsize[0]) - 1) // \
+            self.chunkpixels[0]
+        bottom = (min(self.camera[1] + size[1], self.worldsize[1]) - 1) // \
+            self.chunkpixels[1]
+        return [(i, j) for i in range(left, right + 1)
+                for j in range(top, bottom + 1)]
+
+    def tile(self, column, row):
+        """Return the tile at column, row or None if there is no tile there."""
+        if 0 <= column < self.columns and 0 <= row < len(
+                self.tilelist[column]):
+            return self.tilelist[column][row]
+        return None
+
+    def chunk(self, key):
+        """This method returns the surface for a chunk, drawing its tiles if it
+        is not cached.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            key - This is the (column, row) of the chunk.
+
+        (doc string updated ver 0.2)
+        """
+
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            return surface
+
+        surface = new_surface(self.chunkpixels)
+        blits = []
+        for i in range(self.chunksize[0]):
+            column = key[0] * self.chunksize[0] + i
+            for j in range(self.chunksize[1]):
+                row = key[1] * self.chunksize[1] + j
+                tile = self.tile(column, row)
+                if tile is None:
+                    continue
+                blits.append((tile.image, (i * self.xlen, j * self.ylen)))
+                tile.set_position((column * self.xlen, row * self.ylen))
+                tile.owner = self
+        surface.blits(blits, False)
+
+        self.chunks[key] = surface
+        self.chunkbytes += surface.get_pitch() * surface.get_height()
+        self.evict()
+        return surface
+
+    def evict(self):
+        """Drop the least recently used chunks that are off the screen until
+        the chunks are back under the budget."""
+        visible = set(self.visible_chunks())
+        for key in list(self.chunks):
+            if self.chunkbytes <= self.budget:
+                break
+            if key not in visible:
+                surface = self.chunks.pop(key)
+                self.chunkbytes -= surface.get_pitch() * surface.get_height()
+                self.release_chunk(key)
+
+    def release_chunk(self, key):
+        """Let a lazily loaded tilelist (such as the Lazytiles of the mapfile
+        module) forget the tiles of a chunk that was dropped."""
+        release = getattr(self.tilelist, 'release', None)
+        if release is None:
+            return
+        columns = range(key[0] * self.chunksize[0],
+                        min((key[0] + 1) * self.chunksize[0], self.columns))
+        rows = range(key[1] * self.chunksize[1],
+                     min((key[1] + 1) * self.chunksize[1], self.rows))
+        release([(i, j) for i in columns for j in rows])
+
+    def compose(self):
+        """Draw the chunks under the camera onto the screen image, followed by
+        the buttons of the button list so they stay on top of the map."""
+        self.image.fill((0, 0, 0))
+        keys = self.visible_chunks()
+        self.image.blits([(self.chunk(key),
+                           (key[0] * self.chunkpixels[0] - self.camera[0],
+                            key[1] * self.chunkpixels[1] - self.camera[1]))
+                          for key in keys], False)
+        self.image.blits([i.blitinfo for i in self.buttonlist], False)
+        if self.profiler is not None:
+            self.profiler.count('blits', len(keys) + len(self.buttonlist))
+        self.moved = False
+        self.fullredraw = True
+
+    def redraw_tiles(self):
+        """Draw the tiles that changed into their cached chunks and onto the
+        screen image if they are on the screen."""
+        bounds = self.image.get_rect()
+        for tile in self.dirty_tiles.values():
+            if tile.owner is not self:
+                continue
+            key = (tile.pos[0] // self.chunkpixels[0],
+                   tile.pos[1] // self.chunkpixels[1])
+            surface = self.chunks.get(key)
+            if surface is not None:
+                surface.blit(tile.image,
+                             (tile.pos[0] - key[0] * self.chunkpixels[0],
+                              tile.pos[1] - key[1] * self.chunkpixels[1]))
+            rect = pygame.Rect((tile.pos[0] - self.camera[0],
+                                tile.pos[1] - self.camera[1]),
+                               tile.image.get_size())
+            if rect.colliderect(bounds):
+                self.image.blit(tile.image, rect)
+                self.mark_dirty(rect)
+            tile.dirty = 0
+        self.dirty_tiles.clear()
+
+    def prepare_frame(self):
+        if self.moved:
+            # Patch the cached chunks with changed tiles before drawing them
+            if self.dirty_tiles:
+                self.redraw_tiles()
+            self.compose()
+            return True
+        return Tilemap.prepare_frame(self)
+
+    def handle_event(self, event):
+        # Scroll one tile for each arrow key press or mouse wheel step
+        if event.type == pygame.KEYDOWN:
+            steps = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0),
+                     pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+            if event.key in steps:
+                step = steps[event.key]
+                self.scroll(step[0] * self.scrollstep[0],
+                            step[1] * self.scrollstep[1])
+                return True
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll(-event.x * self.scrollstep[0],
+                        -event.y * self.scrollstep[1])
+            return True
+        elif (event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and
+              event.button in (4, 5)):
+            # The wheel is handled through the MOUSEWHEEL event
+            return True
+        return False
+
+    def tile_at(self, pos):
+        """This method returns the tile under a position on the display, or
+        None if there is no tile there.
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        Inputs:
+            pos - This is the x, y position on the display, such as the pos
+                attribute of a mouse event.
+
+        (doc string updated ver 0.2)
+        """
+
+        x = pos[0] - self.pos[0]
+        y = pos[1] - self.pos[1]
+        if not self.image.get_rect().collidepoint(x, y):
+            return None
+        return self.tile((x + self.camera[0]) // self.xlen,
+                         (y + self.camera[1]) // self.ylen)
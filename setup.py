@@ -9,6 +9,10 @@ setup(name='pygame_toolbox',
       author_email='jmilam343@gmail.com',
       url='https://github.com/jbm950/pygame_toolbox',
       packages=find_packages(),
+      # pygame.event.wait(timeout), used by the 'event' frame mode, needs
+      # pygame 2.0.1. NumPy is only used by tilestate and pathfinding.
+      install_requires=['pygame>=2.0.1'],
+      extras_require={'numpy': ['numpy']},
       classifers=[
           'Development Status :: 3 - Alpha',
           'Intended Audience :: Developers',